@@ -1,8 +1,16 @@
+import asyncio
 from typing import Dict
 
+from configurations.config import settings
+from database.db import CausalTokenMiddleware
 from fastapi import Depends, FastAPI
+from routes.audit import audit_router
 from routes.candidates import candidate_router
+from routes.jobs import job_router
 from routes.users import user_router
+from utils.loop_monitor import LoopBlockingMonitor, LoopMonitorMiddleware
+from views.audit import audit_log
+from views.jobs import run_worker
 from views.users import verify_user
 
 app = FastAPI(
@@ -13,6 +21,58 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+worker_stop_event = asyncio.Event()
+loop_monitor = LoopBlockingMonitor(threshold=settings.LOOP_SLOW_CALLBACK_MS / 1000)
+
+app.add_middleware(LoopMonitorMiddleware)
+app.add_middleware(CausalTokenMiddleware)
+
+
+@app.on_event("startup")
+async def start_loop_monitor() -> None:
+    """
+    Record event loop blocking callbacks and the routes causing them in debug mode.
+    """
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.install(asyncio.get_running_loop())
+
+
+@app.on_event("startup")
+async def start_embedded_worker() -> None:
+    """
+    Run the job worker inside the API process when the in-memory job queue is used.
+    """
+    if settings.JOB_QUEUE_BACKEND == "memory":
+        app.state.worker = asyncio.create_task(run_worker(worker_stop_event))
+
+
+@app.on_event("shutdown")
+async def stop_embedded_worker() -> None:
+    """
+    Stop the embedded job worker.
+    """
+    worker_stop_event.set()
+    if getattr(app.state, "worker", None):
+        await app.state.worker
+
+
+@app.on_event("shutdown")
+async def flush_audit_log() -> None:
+    """
+    Write the buffered audit events before the process exits.
+    """
+    await audit_log.close()
+
+
+@app.on_event("shutdown")
+async def export_loop_report() -> None:
+    """
+    Write the event loop blocking report.
+    """
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.uninstall()
+        loop_monitor.export(settings.LOOP_MONITOR_REPORT)
+
 
 @app.get("/ping", tags=["Health Check"])
 async def health_check() -> Dict:
@@ -27,3 +87,5 @@ async def health_check() -> Dict:
 
 app.include_router(user_router)
 app.include_router(candidate_router, dependencies=[Depends(verify_user)])
+app.include_router(job_router, dependencies=[Depends(verify_user)])
+app.include_router(audit_router, dependencies=[Depends(verify_user)])
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -11,6 +11,31 @@ class DevelopmentSettings(BaseSettings):
     ACCESS_TOKEN_EXPIRE: Optional[str] = None
     JWT_SECRET: Optional[str] = None
     JWT_ALGORITHM: Optional[str] = None
+    IDEMPOTENCY_KEY_TTL: int = 86400
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0
+    IDEMPOTENCY_CLAIM_TIMEOUT: int = 60
+    JOB_QUEUE_BACKEND: str = "mongo"
+    JOB_WORKER_PROCESSES: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 2.0
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_LEASE_SECONDS: int = 60
+    READ_PREFERENCES: Dict[str, str] = {"search": "secondaryPreferred", "export": "secondaryPreferred"}
+    MAX_STALENESS_SECONDS: int = 90
+    CANDIDATE_BATCH_LIMIT: int = 100
+    CANDIDATE_LOADER_WINDOW: float = 0.0
+    EXPORT_DIR: str = "exports"
+    EXPORT_BATCH_SIZE: int = 5000
+    EXPORT_COMPRESSION: str = "zstd"
+    AUDIT_LOG_BACKEND: str = "mongo"
+    AUDIT_LOG_FILE: str = "audit.log"
+    AUDIT_BUFFER_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 1.0
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_SLOW_CALLBACK_MS: float = 100.0
+    LOOP_BLOCKING_BUDGET_MS: float = 100.0
+    LOOP_MONITOR_REPORT: str = "loop_report.json"
 
     class Config:
         env_file = ".env"
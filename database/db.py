@@ -1,15 +1,113 @@
+import base64
+import binascii
 import sys
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+import bson
+from bson.errors import BSONError
+from bson.timestamp import Timestamp
 from configurations.config import settings
 from motor.motor_asyncio import (
     AsyncIOMotorClient,
+    AsyncIOMotorClientSession,
     AsyncIOMotorCollection,
     AsyncIOMotorDatabase
 )
+from pymongo.read_preferences import Nearest, PrimaryPreferred, Secondary, SecondaryPreferred
+
+CALLER_TIMES_LIMIT = 10000
+CAUSAL_TOKEN_HEADER = "X-Causal-Token"
+
+SECONDARY_READ_MODES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Causal times of the current request, read from and returned to the client in `CAUSAL_TOKEN_HEADER`.
+request_causal_times: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_causal_times", default=None)
+
+
+def encode_causal_token(times: Tuple[Dict[str, Any], Timestamp]) -> str:
+    """
+    Encode the cluster and operation time of a session as an opaque client token.
+
+    Args:
+        times: Tuple[Dict[str, Any], Timestamp] - The signed cluster time and the operation time.
+
+    Returns:
+        str: URL safe token.
+    """
+    document: bytes = bson.encode({"clusterTime": times[0], "operationTime": times[1]})
+    return base64.urlsafe_b64encode(document).decode()
+
+
+def decode_causal_token(token: Optional[str]) -> Optional[Tuple[Dict[str, Any], Timestamp]]:
+    """
+    Decode a client token made by `encode_causal_token`.
+
+    Args:
+        token: Optional[str] - The token sent by the client.
+
+    Returns:
+        Optional[Tuple[Dict[str, Any], Timestamp]]: The cluster and operation time, None if the
+            token is missing or invalid.
+    """
+    if not token:
+        return None
+    try:
+        document: Dict[str, Any] = bson.decode(base64.urlsafe_b64decode(token.encode()))
+    except (BSONError, binascii.Error, ValueError):
+        return None
+
+    cluster_time: Any = document.get("clusterTime")
+    operation_time: Any = document.get("operationTime")
+    if not isinstance(cluster_time, dict) or not isinstance(cluster_time.get("clusterTime"), Timestamp):
+        return None
+    if not isinstance(operation_time, Timestamp):
+        return None
+    return cluster_time, operation_time
+
+
+class CausalTokenMiddleware:
+    """
+    ASGI middleware carrying the causal times of a client between requests.
+
+    The token a client sends back makes its reads observe its own writes on any API process.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header: bytes = dict(scope["headers"]).get(CAUSAL_TOKEN_HEADER.lower().encode(), b"")
+        state: Dict[str, Any] = {"times": decode_causal_token(header.decode("latin-1"))}
+
+        async def send_with_token(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and state["times"]:
+                token: bytes = encode_causal_token(state["times"]).encode()
+                token_header: Tuple[bytes, bytes] = (CAUSAL_TOKEN_HEADER.lower().encode(), token)
+                message = {**message, "headers": [*message.get("headers", []), token_header]}
+            await send(message)
+
+        context_token = request_causal_times.set(state)
+        try:
+            await self.app(scope, receive, send_with_token)
+        finally:
+            request_causal_times.reset(context_token)
 
 
 class Database:
     _instance = None
+    _caller_times: "OrderedDict[str, Tuple]" = OrderedDict()
 
     def __new__(cls) -> AsyncIOMotorDatabase:
         """
@@ -30,25 +128,72 @@ class Database:
         return cls._instance
 
     @classmethod
-    async def get_collection(cls, collection_name) -> AsyncIOMotorCollection:
+    async def get_collection(cls, collection_name, operation: Optional[str] = None) -> AsyncIOMotorCollection:
         """
         Get a collection from the database.
 
         Args:
             collection_name: str - The name of the collection.
+            operation: Optional[str] - Kind of read, routed with the `READ_PREFERENCES` setting.
+                Operations that are not configured, and all writes, go to the primary.
 
         Returns:
             AsyncIOMotorCollection: The specified collection.
         """
         db_instance: AsyncIOMotorDatabase = cls().__new__(cls)
-        return db_instance.db[collection_name]
+        collection: AsyncIOMotorCollection = db_instance.db[collection_name]
+
+        mode: Optional[str] = settings.READ_PREFERENCES.get(operation) if operation else None
+        if mode in SECONDARY_READ_MODES:
+            read_preference = SECONDARY_READ_MODES[mode](max_staleness=settings.MAX_STALENESS_SECONDS)
+            collection = collection.with_options(read_preference=read_preference)
+
+        return collection
+
+    @classmethod
+    @asynccontextmanager
+    async def causal_session(cls, *callers: Optional[str]) -> AsyncIterator[AsyncIOMotorClientSession]:
+        """
+        Start a causally consistent session that continues from the callers' last operations.
+
+        Reads in the session, including secondary reads, observe every write the callers
+        made in earlier sessions of this process, and every write covered by the causal
+        token the client sent with the request.
+
+        Args:
+            *callers: Optional[str] - Identifiers of the callers, usually user uuids.
+
+        Yields:
+            AsyncIOMotorClientSession: The session to pass to the collection operations.
+        """
+        async with await cls().client.start_session(causal_consistency=True) as session:
+            callers: Tuple[str, ...] = tuple(caller for caller in callers if caller)
+            request_state: Optional[Dict[str, Any]] = request_causal_times.get()
+            seen: List[Optional[Tuple]] = [cls._caller_times.get(caller) for caller in callers]
+            if request_state:
+                seen.append(request_state["times"])
+            for last_seen in seen:
+                if last_seen:
+                    session.advance_cluster_time(last_seen[0])
+                    session.advance_operation_time(last_seen[1])
+
+            yield session
+
+            if session.operation_time is not None:
+                if request_state is not None:
+                    request_state["times"] = (session.cluster_time, session.operation_time)
+                for caller in callers:
+                    cls._caller_times[caller] = (session.cluster_time, session.operation_time)
+                    cls._caller_times.move_to_end(caller)
+                while len(cls._caller_times) > CALLER_TIMES_LIMIT:
+                    cls._caller_times.popitem(last=False)
 
     @classmethod
-    def drop_database(cls):
+    async def drop_database(cls):
         """
         Drop the entire database.
         """
-        cls()._instance.client.drop_database(cls()._instance.db.name)
+        await cls()._instance.client.drop_database(cls()._instance.db.name)
 
 
 database: Database = Database()
@@ -0,0 +1,39 @@
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Query
+
+from schemas.audit_schema import AuditEventSchema
+from utils.constants import NOT_FOUND
+from views.audit import audit_log
+
+audit_router = APIRouter(
+    prefix="/audit",
+    tags=["audit"],
+    responses={404: {"description": NOT_FOUND}},
+)
+
+
+@audit_router.get("/events", response_model=List[AuditEventSchema])
+async def get_audit_events(
+        action: Optional[str] = None,
+        actor: Optional[str] = None,
+        target: Optional[str] = None,
+        limit: int = Query(default=100, ge=1, le=1000),
+) -> List[AuditEventSchema]:
+    """
+    Retrieve the latest audit events, newest first.
+
+    Args:
+        action: Optional[str] - Only return events of this action, e.g. "candidate.update".
+        actor: Optional[str] - Only return events of this user email.
+        target: Optional[str] - Only return events about this candidate or user.
+        limit: int - Maximum number of events returned.
+
+    Returns:
+        List[AuditEventSchema]: The audit events as per schema.
+    """
+    filters: Dict[str, str] = {
+        field: value for field, value in {"action": action, "actor": actor, "target": target}.items() if value
+    }
+
+    return await audit_log.query(filters, limit)
@@ -1,24 +1,57 @@
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from database.db import database
 from schemas.candidates_schema import (
+    CandidateBatchRequestSchema,
+    CandidateBatchResponseSchema,
+    CandidateChangeSchema,
     CandidateRegisterRequestSchema,
     CandidateRegisterResponseSchema,
+    ExportRequestSchema,
     UpdateCandidateRequestSchema,
     SearchParametersSchema,
+    StorageReportSchema,
 )
 from utils.constants import (
     NOT_FOUND,
     EMAIL_ALREADY_EXIST,
     CANDIDATE_REGISTERED_SUCCESSFULLY,
     RECORD_DELETED_SUCCESSFULLY,
-    SUCCESS
+    JOB_QUEUED,
+    PARQUET_UNAVAILABLE,
+    CANDIDATE_UPDATE_CONFLICT,
+    SKILLS_UPDATE_CONFLICT
 )
-from views.candidates import add_data_to_csv, add_data_filters
+from views.audit import audit_log
+from views.candidate_storage import (
+    REVISION_FIELD,
+    canonical_uuid,
+    decode_candidate,
+    encode_candidate,
+    storage_report,
+    upgrade_candidate,
+    uuid_filter,
+)
+from views.candidates import (
+    CANDIDATE_UPDATE_ATTEMPTS,
+    add_data_filters,
+    build_candidate_update,
+    candidate_loader,
+    fetch_candidates,
+    get_candidates_collection,
+    get_history_collection,
+    record_candidate_changes,
+)
+from views.exports import parquet_available
+from views.idempotency import run_idempotent
+from views.jobs import enqueue_job
+from views.users import verify_user
 
 candidate_router = APIRouter(
     prefix="/candidate",
@@ -28,148 +61,298 @@ candidate_router = APIRouter(
 
 
 @candidate_router.post("/create")
-async def register_new_candidate(candidate: CandidateRegisterRequestSchema) -> Dict[str, str]:
+async def register_new_candidate(
+        candidate: CandidateRegisterRequestSchema,
+        idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+        user: Dict = Depends(verify_user),
+) -> Dict[str, str]:
     """
     Register a new candidate.
 
     Args:
         candidate: CandidateRegisterRequestSchema - The candidate data to be registered.
+        idempotency_key: Optional[str] - Key that makes client retries return the first response.
+        user: Dict - The authenticated user.
 
     Returns:
         Dict[str, str]: A dictionary with a message indicating the registration status.
     """
-    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates")
+    candidate_data: Dict = candidate.model_dump()
 
-    candidate_check: Dict = await candidates_collection.find_one({"email": candidate.email})
-    if candidate_check:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=EMAIL_ALREADY_EXIST
-        )
+    async def create_candidate() -> Dict[str, str]:
+        candidates_collection: AsyncIOMotorCollection = await get_candidates_collection()
 
-    candidate_data: Dict = candidate.model_dump()
-    candidate_uuid = str(uuid.uuid4())
-    candidate_data["uuid"] = candidate_uuid
-    await candidates_collection.insert_one(candidate_data)
+        async with database.causal_session(user["uuid"]) as session:
+            candidate_check: Dict = await candidates_collection.find_one({"email": candidate.email}, session=session)
+            if candidate_check:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=EMAIL_ALREADY_EXIST
+                )
+
+            candidate_uuid = str(uuid.uuid4())
+            candidate_document: Dict = await encode_candidate({**candidate_data, "uuid": candidate_uuid})
+            try:
+                await candidates_collection.insert_one(candidate_document, session=session)
+            except DuplicateKeyError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=EMAIL_ALREADY_EXIST
+                )
+
+        await audit_log.record("candidate.create", user["email"], candidate_uuid)
+        return {"message": CANDIDATE_REGISTERED_SUCCESSFULLY, "uuid": candidate_uuid}
 
-    return {"message": CANDIDATE_REGISTERED_SUCCESSFULLY, "uuid": candidate_uuid}
+    return await run_idempotent(
+        f"/candidate/create:{user['uuid']}", idempotency_key, candidate_data, create_candidate
+    )
 
 
 @candidate_router.get("/get/{candidate_id}", response_model=CandidateRegisterResponseSchema)
-async def get_candidate(candidate_id: str) -> CandidateRegisterResponseSchema:
+async def get_candidate(candidate_id: str, user: Dict = Depends(verify_user)) -> CandidateRegisterResponseSchema:
     """
     Retrieve details of a candidate.
 
     Args:
         candidate_id: str - The unique identifier of the candidate.
+        user: Dict - The authenticated user.
 
     Returns:
         CandidateRegisterResponseSchema: Details of the candidate as per schema.
     """
-    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates")
-
-    candidate: Dict = await candidates_collection.find_one({"uuid": candidate_id})
+    candidates_collection: AsyncIOMotorCollection = await get_candidates_collection()
 
+    candidate: Dict = await candidate_loader.load(candidate_id, user["uuid"])
     if not candidate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
         )
 
+    async with database.causal_session(user["uuid"]) as session:
+        candidate = await upgrade_candidate(candidates_collection, candidate, session=session)
+
     return CandidateRegisterResponseSchema(**candidate)
 
 
+@candidate_router.post("/get-many", response_model=CandidateBatchResponseSchema)
+async def get_many_candidates(
+        batch: CandidateBatchRequestSchema, user: Dict = Depends(verify_user)
+) -> CandidateBatchResponseSchema:
+    """
+    Retrieve details of several candidates with a single query.
+
+    Args:
+        batch: CandidateBatchRequestSchema - The unique identifiers of the candidates.
+        user: Dict - The authenticated user.
+
+    Returns:
+        CandidateBatchResponseSchema: The candidates in requested order and the identifiers that were not found.
+    """
+    candidates_collection: AsyncIOMotorCollection = await get_candidates_collection()
+
+    candidate_ids: List[str] = list(dict.fromkeys(canonical_uuid(candidate_id) for candidate_id in batch.uuids))
+    candidates: Dict[str, Dict] = await fetch_candidates(candidate_ids, user["uuid"])
+
+    found: List[Dict] = []
+    async with database.causal_session(user["uuid"]) as session:
+        for candidate_id in candidate_ids:
+            if candidate_id in candidates:
+                found.append(await upgrade_candidate(candidates_collection, candidates[candidate_id], session=session))
+
+    return CandidateBatchResponseSchema(
+        candidates=found,
+        missing=[candidate_id for candidate_id in candidate_ids if candidate_id not in candidates],
+    )
+
+
 @candidate_router.put("/update/{candidate_id}", response_model=CandidateRegisterResponseSchema)
 async def update_candidate_data(
-        candidate_id: str, candidate: UpdateCandidateRequestSchema
+        candidate_id: str, candidate: UpdateCandidateRequestSchema, user: Dict = Depends(verify_user)
 ) -> CandidateRegisterResponseSchema:
     """
-    Update candidate data.
+    Update candidate data, writing only the fields whose value changed.
 
     Args:
         candidate_id: str - The unique identifier of the candidate.
         candidate: UpdateCandidateRequestSchema - The updated candidate data.
+        user: Dict - The authenticated user.
 
     Returns:
         CandidateRegisterResponseSchema: Updated details of the candidate as per schema.
     """
-    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates")
-
-    candidate_check: Dict = await candidates_collection.find_one({"uuid": candidate_id})
-    if not candidate_check:
+    candidate_id = canonical_uuid(candidate_id)
+    update_fields: Dict = candidate.model_dump(exclude_unset=True, exclude={"add_skills", "remove_skills"})
+    if "skills" in update_fields and (candidate.add_skills or candidate.remove_skills):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
+            status_code=status.HTTP_400_BAD_REQUEST, detail=SKILLS_UPDATE_CONFLICT
         )
 
-    update_fields: Dict = candidate.model_dump(exclude_unset=True)
-    if update_fields:
-        update_query: Dict = {"$set": update_fields}
-        await candidates_collection.update_one({"uuid": candidate_id}, update_query)
+    candidates_collection: AsyncIOMotorCollection = await get_candidates_collection()
+
+    async with database.causal_session(user["uuid"]) as session:
+        for _ in range(CANDIDATE_UPDATE_ATTEMPTS):
+            candidate_check: Dict = await candidates_collection.find_one(uuid_filter(candidate_id), session=session)
+            if not candidate_check:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
+                )
+            current: Dict = await upgrade_candidate(candidates_collection, candidate_check, session=session)
+
+            update, changes = await build_candidate_update(
+                current, update_fields, candidate.add_skills, candidate.remove_skills
+            )
+            if not update:
+                return current
+
+            # Matches nothing if the candidate was updated or deleted since it was read; the diff is then recomputed.
+            updated: Optional[Dict] = await candidates_collection.find_one_and_update(
+                {"_id": candidate_check["_id"], REVISION_FIELD: candidate_check.get(REVISION_FIELD)}, update,
+                session=session, return_document=ReturnDocument.AFTER,
+            )
+            if updated:
+                break
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail=CANDIDATE_UPDATE_CONFLICT
+            )
+        await record_candidate_changes(candidate_id, user["email"], changes, session=session)
+        await audit_log.record("candidate.update", user["email"], candidate_id, fields=sorted(changes))
+
+    return await decode_candidate(updated)
+
+
+@candidate_router.get("/history/{candidate_id}", response_model=List[CandidateChangeSchema])
+async def get_candidate_history(candidate_id: str) -> List[CandidateChangeSchema]:
+    """
+    Retrieve the field level change history of a candidate, newest first.
 
-    return await candidates_collection.find_one({"uuid": candidate_id})
+    Args:
+        candidate_id: str - The unique identifier of the candidate.
+
+    Returns:
+        List[CandidateChangeSchema]: The recorded changes as per schema.
+    """
+    history_collection: AsyncIOMotorCollection = await get_history_collection()
+
+    return await history_collection.find(
+        {"candidate": canonical_uuid(candidate_id)}, {"_id": 0}
+    ).sort([("changed_at", -1), ("_id", -1)]).to_list(length=None)
 
 
 @candidate_router.delete("/delete/{candidate_id}")
-async def delete_candidate(candidate_id: str) -> Dict[str, str]:
+async def delete_candidate(candidate_id: str, user: Dict = Depends(verify_user)) -> Dict[str, str]:
     """
     Delete candidate.
 
     Args:
         candidate_id: str - The unique identifier of the candidate to be deleted.
+        user: Dict - The authenticated user.
 
     Returns:
         Dict[str, str]: A dictionary with a message indicating the deletion status.
     """
-    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates")
+    candidate_id = canonical_uuid(candidate_id)
+    candidates_collection: AsyncIOMotorCollection = await get_candidates_collection()
 
-    candidate = await candidates_collection.find_one({"uuid": candidate_id})
-    if not candidate:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
-        )
+    async with database.causal_session(user["uuid"]) as session:
+        candidate = await candidates_collection.find_one(uuid_filter(candidate_id), session=session)
+        if not candidate:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
+            )
+
+        await candidates_collection.delete_one({"_id": candidate["_id"]}, session=session)
 
-    await candidates_collection.delete_one({"uuid": candidate_id})
+    await audit_log.record("candidate.delete", user["email"], candidate_id)
 
     return {"message": RECORD_DELETED_SUCCESSFULLY}
 
 
 @candidate_router.post("/all-candidates", response_model=List[CandidateRegisterResponseSchema])
-async def get_all_candidates(candidate_filter: SearchParametersSchema) -> List[CandidateRegisterResponseSchema]:
+async def get_all_candidates(
+        candidate_filter: SearchParametersSchema, user: Dict = Depends(verify_user)
+) -> List[CandidateRegisterResponseSchema]:
     """
     Retrieve all candidates based on filtering criteria.
 
     Args:
         candidate_filter: SearchParametersSchema - Filtering criteria for candidates.
+        user: Dict - The authenticated user.
 
     Returns:
         List[CandidateRegisterResponseSchema]: A list of candidate details as per schema.
     """
-    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates")
+    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates", "search")
 
     filters: Dict = await add_data_filters(candidate_filter)
-    candidates: List = await candidates_collection.find(filters).to_list(length=None)
+    async with database.causal_session(user["uuid"]) as session:
+        candidates: List = await candidates_collection.find(filters, session=session).to_list(length=None)
 
     if not candidates:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
         )
 
-    return candidates
+    return [await decode_candidate(candidate) for candidate in candidates]
 
 
 @candidate_router.get("/generate-csv-report")
 async def generate_csv_report() -> Dict[str, str]:
     """
-    Generate CSV report of candidates.
+    Queue generation of a CSV report of candidates on the background worker.
 
     Returns:
-        Dict[str, str]: A dictionary with a message indicating the report generation status.
+        Dict[str, str]: A dictionary with a message and the id of the queued job.
     """
-    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates")
+    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates", "export")
 
-    candidates: List = await candidates_collection.find({}).to_list(length=None)
-    if not candidates:
+    candidate: Dict = await candidates_collection.find_one({}, {"_id": 1})
+    if not candidate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
         )
-    add_data_to_csv(candidates)
+    job_data: Dict = await enqueue_job("csv_report")
+
+    return {"message": JOB_QUEUED, "job_id": job_data["job_id"]}
+
+
+@candidate_router.post("/export")
+async def export_candidates(export: ExportRequestSchema) -> Dict[str, str]:
+    """
+    Queue a columnar export of all candidates for analytics consumers.
+
+    Args:
+        export: ExportRequestSchema - Output format and optional partitioning field.
+
+    Returns:
+        Dict[str, str]: A dictionary with a message and the id of the queued job.
+    """
+    if export.format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=PARQUET_UNAVAILABLE
+        )
+    job_data: Dict = await enqueue_job("candidates_export", export.model_dump())
+
+    return {"message": JOB_QUEUED, "job_id": job_data["job_id"]}
+
+
+@candidate_router.get("/storage-report", response_model=StorageReportSchema)
+async def get_storage_report() -> StorageReportSchema:
+    """
+    Report bytes per candidate document in legacy and compact form, and the index size.
+
+    Returns:
+        StorageReportSchema: The storage report as per schema.
+    """
+    return StorageReportSchema(**await storage_report())
+
+
+@candidate_router.post("/migrate-storage")
+async def migrate_candidate_storage() -> Dict[str, str]:
+    """
+    Queue the upgrade of all legacy candidate documents to the compact storage version.
+
+    Returns:
+        Dict[str, str]: A dictionary with a message and the id of the queued job.
+    """
+    job_data: Dict = await enqueue_job("candidate_storage_migration")
 
-    return {"message": SUCCESS}
+    return {"message": JOB_QUEUED, "job_id": job_data["job_id"]}
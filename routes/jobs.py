@@ -0,0 +1,58 @@
+from typing import Dict
+
+from fastapi import APIRouter, HTTPException, status
+
+from schemas.jobs_schema import JobResponseSchema
+from utils.constants import NOT_FOUND, JOB_CANNOT_BE_CANCELLED
+from views.jobs import get_job_queue
+
+job_router = APIRouter(
+    prefix="/job",
+    tags=["job"],
+    responses={404: {"description": NOT_FOUND}},
+)
+
+
+@job_router.get("/get/{job_id}", response_model=JobResponseSchema)
+async def get_job(job_id: str) -> JobResponseSchema:
+    """
+    Retrieve the status and progress of a background job.
+
+    Args:
+        job_id: str - The unique identifier of the job.
+
+    Returns:
+        JobResponseSchema: Details of the job as per schema.
+    """
+    job_data: Dict = await get_job_queue().get(job_id)
+    if not job_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
+        )
+
+    return JobResponseSchema(**job_data)
+
+
+@job_router.post("/cancel/{job_id}", response_model=JobResponseSchema)
+async def cancel_job(job_id: str) -> JobResponseSchema:
+    """
+    Cancel a queued job, or ask a running job to stop at its next progress report.
+
+    Args:
+        job_id: str - The unique identifier of the job.
+
+    Returns:
+        JobResponseSchema: Details of the job after the cancellation request.
+    """
+    queue = get_job_queue()
+    job_data: Dict = await queue.cancel(job_id)
+    if job_data:
+        return JobResponseSchema(**job_data)
+
+    if not await queue.get(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail=JOB_CANNOT_BE_CANCELLED
+    )
@@ -1,9 +1,11 @@
 import uuid
-from typing import Dict
+from typing import Dict, Optional
 
 from database.db import database
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
 from schemas.users_schema import (
     UserLoginRequestSchema,
     UserRegisterRequestSchema,
@@ -16,9 +18,12 @@ from utils.constants import (
     INCORRECT_EMAIL_PASSWORD,
     NOT_FOUND
 )
+from views.audit import audit_log
+from views.idempotency import run_idempotent
 from views.users import (
     create_access_token,
     authenticate_user,
+    get_user_collection,
     hash_password
 )
 
@@ -30,30 +35,44 @@ user_router = APIRouter(
 
 
 @user_router.post("/register", response_model=UserRegisterResponseSchema)
-async def register_user(user: UserRegisterRequestSchema) -> Dict[str, str]:
+async def register_user(
+        user: UserRegisterRequestSchema,
+        idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+) -> Dict[str, str]:
     """
     Register new User.
 
     Args:
         user: UserRegisterRequestSchema - The user data to be registered.
+        idempotency_key: Optional[str] - Key that makes client retries return the first response.
 
     Returns:
         Dict[str, str]: A dictionary with a message indicating the registration status.
     """
-    user_collection: AsyncIOMotorCollection = await database.get_collection("users")
-    existing_user: Dict = await user_collection.find_one({"email": user.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=EMAIL_ALREADY_EXIST
-        )
+    async def create_user() -> Dict[str, str]:
+        user_collection: AsyncIOMotorCollection = await get_user_collection()
+        existing_user: Dict = await user_collection.find_one({"email": user.email})
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=EMAIL_ALREADY_EXIST
+            )
+
+        user_data: Dict = user.model_dump()
 
-    user_data: Dict = user.model_dump()
+        user_data["uuid"] = str(uuid.uuid4())
+        user_data["password"] = await run_in_threadpool(hash_password, user.password.get_secret_value())
+        try:
+            await user_collection.insert_one(user_data)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=EMAIL_ALREADY_EXIST
+            )
 
-    user_data["uuid"] = str(uuid.uuid4())
-    user_data["password"] = hash_password(user.password.get_secret_value())
-    await user_collection.insert_one(user_data)
+        return {"message": USER_REGISTERED_SUCCESSFULLY}
 
-    return {"message": USER_REGISTERED_SUCCESSFULLY}
+    # The password is left out of the fingerprint so it is never persisted with the key.
+    fingerprint_payload: Dict = user.model_dump(exclude={"password"})
+    return await run_idempotent("/user/register", idempotency_key, fingerprint_payload, create_user)
 
 
 @user_router.post("/login")
@@ -77,6 +96,7 @@ async def login_user(user: UserLoginRequestSchema) -> Dict[str, str]:
     )
 
     if not user_data or not authenticate:
+        await audit_log.record("user.login_failed", user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=INCORRECT_EMAIL_PASSWORD
@@ -88,4 +108,5 @@ async def login_user(user: UserLoginRequestSchema) -> Dict[str, str]:
         }
     )
 
+    await audit_log.record("user.login", user_data["email"], user_data["uuid"])
     return {"message": SUCCESS, "access_token": access_token}
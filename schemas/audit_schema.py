@@ -0,0 +1,12 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class AuditEventSchema(BaseModel):
+    action: str
+    actor: Optional[str] = None
+    target: Optional[str] = None
+    details: Dict[str, Any] = {}
+    created_at: datetime
@@ -1,6 +1,8 @@
-from typing import Optional, Literal
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Literal
 
-from pydantic import BaseModel, EmailStr
+from configurations.config import settings
+from pydantic import BaseModel, EmailStr, Field
 
 
 class CandidateRegisterRequestSchema(BaseModel):
@@ -42,6 +44,8 @@ class UpdateCandidateRequestSchema(BaseModel):
     years_of_experience: Optional[int] = None
     degree_type: Literal["Bachelor", "Master", "High School"] = None
     skills: Optional[list] = None
+    add_skills: Optional[list] = None
+    remove_skills: Optional[list] = None
     nationality: Optional[str] = None
     city: Optional[str] = None
     salary: Optional[float] = None
@@ -62,3 +66,33 @@ class SearchParametersSchema(BaseModel):
     city: Optional[str] = None
     salary: Optional[float] = None
     gender: Optional[Literal["Male", "Female", "Not Specified"]] = None
+
+
+class StorageReportSchema(BaseModel):
+    documents: int
+    compact_documents: int
+    avg_document_bytes: float
+    avg_legacy_document_bytes: float
+    avg_compact_document_bytes: float
+    total_index_bytes: int
+    index_bytes: Dict[str, int]
+
+
+class CandidateBatchRequestSchema(BaseModel):
+    uuids: List[str] = Field(min_length=1, max_length=settings.CANDIDATE_BATCH_LIMIT)
+
+
+class CandidateBatchResponseSchema(BaseModel):
+    candidates: List[CandidateRegisterResponseSchema]
+    missing: List[str]
+
+
+class ExportRequestSchema(BaseModel):
+    format: Literal["parquet", "csv"] = "parquet"
+    partition_by: Optional[Literal["nationality", "city", "career_level", "degree_type", "gender"]] = None
+
+
+class CandidateChangeSchema(BaseModel):
+    actor: Optional[str] = None
+    changed_at: datetime
+    changes: Dict[str, Dict[str, Any]]
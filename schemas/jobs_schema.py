@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class JobResponseSchema(BaseModel):
+    job_id: str
+    name: str
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    progress: int
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
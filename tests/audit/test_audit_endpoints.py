@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from fastapi import status
+
+from tests.candidates.test_candidate_endpoints import register_candidate
+from views.audit import AUDIT_QUERY_FIELDS, AuditLog, FileAuditSink, MongoAuditSink, get_audit_collection
+
+
+class SlowAuditSink:
+    """
+    Sink that records the size of every written batch.
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    async def write(self, events):
+        await asyncio.sleep(0.01)
+        self.batches.append(len(events))
+
+
+class TestAudit:
+
+    @pytest.mark.anyio
+    async def test_candidate_mutations_are_audited(self, client, jwt_token):
+        """
+        Test case to create and delete a candidate and verify both events are returned newest first.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+        await client.delete(f"/candidate/delete/{candidate_id}", headers=headers)
+
+        response = await client.get("/audit/events", headers=headers, params={"target": candidate_id})
+        assert response.status_code == status.HTTP_200_OK
+        assert [event["action"] for event in response.json()] == ["candidate.delete", "candidate.create"]
+        assert response.json()[0]["actor"] == "user@example.com"
+
+    @pytest.mark.anyio
+    async def test_login_is_audited(self, client, jwt_token):
+        """
+        Test case to login and verify the login event is recorded.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        response = await client.post("/user/login", json={"email": "user@example.com", "password": "12345678"})
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.get("/audit/events", headers=headers, params={"action": "user.login"})
+        assert len(response.json()) == 1
+        assert response.json()[0]["actor"] == "user@example.com"
+
+    @pytest.mark.anyio
+    async def test_full_buffer_applies_back_pressure(self):
+        """
+        Test case to overflow a small buffer and verify every event is written in batches.
+        """
+        sink = SlowAuditSink()
+        audit_log = AuditLog(sink, max_size=5, batch_size=4, flush_interval=0.05)
+
+        for index in range(20):
+            await audit_log.record("test.event", target=str(index))
+        await audit_log.close()
+
+        assert sum(sink.batches) == 20
+        assert max(sink.batches) <= 4
+
+    @pytest.mark.anyio
+    async def test_file_sink(self, tmp_path):
+        """
+        Test case to write events to the append-only file and query them back.
+        """
+        audit_log = AuditLog(FileAuditSink(str(tmp_path / "audit.log")), max_size=10, batch_size=10, flush_interval=1)
+
+        await audit_log.record("candidate.create", "user@example.com", "first")
+        await audit_log.record("candidate.delete", "user@example.com", "first")
+
+        events = await audit_log.query({"action": "candidate.delete"})
+        await audit_log.close()
+        assert [event["target"] for event in events] == ["first"]
+
+    @pytest.mark.anyio
+    async def test_mongo_sink_indexes_queries(self):
+        """
+        Test case to write events to MongoDB and verify the query fields are indexed by event time.
+        """
+        audit_log = AuditLog(MongoAuditSink(), max_size=10, batch_size=10, flush_interval=1)
+
+        await audit_log.record("candidate.create", "user@example.com", "first")
+        events = await audit_log.query({"actor": "user@example.com"})
+        await audit_log.close()
+        assert [event["target"] for event in events] == ["first"]
+
+        collection = await get_audit_collection()
+        index_keys = [index["key"] for index in (await collection.index_information()).values()]
+        assert [("created_at", -1)] in index_keys
+        for field in AUDIT_QUERY_FIELDS:
+            assert [(field, 1), ("created_at", -1)] in index_keys
@@ -1,6 +1,33 @@
+import asyncio
+import uuid
+from datetime import datetime
+
 import pytest
 from fastapi import status
 
+import views.candidates
+from configurations.config import settings
+from database.db import database
+from views.candidate_storage import REVISION_FIELD
+from views.candidates import candidate_loader, fetch_candidates
+from views.idempotency import get_idempotency_collection, request_fingerprint
+from views.users import create_access_token
+
+CANDIDATE_PAYLOAD = {
+    "first_name": "John",
+    "last_name": "Doe",
+    "email": "johndoe@example.com",
+    "career_level": "Senior",
+    "job_major": "Engineer",
+    "years_of_experience": 5,
+    "degree_type": "Bachelor",
+    "skills": ["Python", "SQL"],
+    "nationality": "Country",
+    "city": "City",
+    "salary": 80000.0,
+    "gender": "Male"
+}
+
 
 async def register_candidate(client, jwt_token):
     """
@@ -102,3 +129,317 @@ class TestCandidates:
 
         response = await client.get("/candidate/generate-csv-report", headers=headers)
         assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.anyio
+    async def test_register_candidate_concurrent_duplicates_without_key(self, client, jwt_token):
+        """
+        Test case to send concurrent registrations of one email without an idempotency key and verify a single insert.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+
+        responses = await asyncio.gather(*[
+            client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD) for _ in range(3)
+        ])
+        assert sorted(response.status_code for response in responses) == [200, 400, 400]
+
+        candidates_collection = await database.get_collection("candidates")
+        assert await candidates_collection.count_documents({}) == 1
+
+    @pytest.mark.anyio
+    async def test_register_candidate_replay_with_idempotency_key(self, client, jwt_token):
+        """
+        Test case to replay a candidate registration and verify the stored response is returned.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}", "Idempotency-Key": "create-john"}
+
+        first = await client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD)
+        assert first.status_code == status.HTTP_200_OK
+
+        replay = await client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD)
+        assert replay.status_code == status.HTTP_200_OK
+        assert replay.json() == first.json()
+
+    @pytest.mark.anyio
+    async def test_register_candidate_concurrent_duplicates(self, client, jwt_token):
+        """
+        Test case to send concurrent registrations with one idempotency key and verify a single insert.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}", "Idempotency-Key": "create-john-concurrent"}
+
+        responses = await asyncio.gather(*[
+            client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD) for _ in range(3)
+        ])
+        assert all(response.status_code == status.HTTP_200_OK for response in responses)
+        assert len({response.json()["uuid"] for response in responses}) == 1
+
+    @pytest.mark.anyio
+    async def test_register_candidate_idempotency_key_reuse(self, client, jwt_token):
+        """
+        Test case to reuse an idempotency key with a different payload and verify the error response.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}", "Idempotency-Key": "create-reused"}
+
+        response = await client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD)
+        assert response.status_code == status.HTTP_200_OK
+
+        payload = {**CANDIDATE_PAYLOAD, "email": "janedoe@example.com"}
+        response = await client.post("/candidate/create", headers=headers, json=payload)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.anyio
+    async def test_register_candidate_waits_for_claim_of_another_process(self, client, jwt_token):
+        """
+        Test case to send a registration while another process holds the key and verify its response is replayed.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}", "Idempotency-Key": "create-john-elsewhere"}
+        user = await (await database.get_collection("users")).find_one({"email": "user@example.com"})
+        key = f"/candidate/create:{user['uuid']}:create-john-elsewhere"
+        idempotency_collection = await get_idempotency_collection()
+        await idempotency_collection.insert_one({
+            "key": key,
+            "fingerprint": request_fingerprint(CANDIDATE_PAYLOAD),
+            "status": "pending",
+            "created_at": datetime.utcnow(),
+        })
+
+        request = asyncio.create_task(client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD))
+        await asyncio.sleep(0.2)
+        assert not request.done()
+
+        stored_response = {"message": "Candidate Registered Successfully", "uuid": str(uuid.uuid4())}
+        await idempotency_collection.update_one(
+            {"key": key}, {"$set": {"status": "completed", "response": stored_response}}
+        )
+        response = await request
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == stored_response
+
+        candidates_collection = await database.get_collection("candidates")
+        assert await candidates_collection.count_documents({}) == 0
+
+    @pytest.mark.anyio
+    async def test_failed_registration_releases_idempotency_key(self, client, jwt_token):
+        """
+        Test case to fail a registration and verify a retry with the same key runs again.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}", "Idempotency-Key": "create-john-twice"}
+        await register_candidate(client, jwt_token)
+
+        for _ in range(2):
+            response = await client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        idempotency_collection = await get_idempotency_collection()
+        assert await idempotency_collection.count_documents({}) == 0
+
+    @pytest.mark.anyio
+    async def test_idempotency_keys_are_scoped_to_the_user(self, client, jwt_token):
+        """
+        Test case to reuse one idempotency key from two users and verify their requests do not collide.
+        """
+        other_token = await create_access_token({"email": "other@example.com", "id": str(uuid.uuid4())})
+        await (await database.get_collection("users")).insert_one(
+            {"email": "other@example.com", "uuid": str(uuid.uuid4())}
+        )
+
+        headers = {"Authorization": f"Bearer {jwt_token}", "Idempotency-Key": "shared-key"}
+        first = await client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD)
+        assert first.status_code == status.HTTP_200_OK
+
+        headers = {"Authorization": f"Bearer {other_token}", "Idempotency-Key": "shared-key"}
+        payload = {**CANDIDATE_PAYLOAD, "email": "janedoe@example.com"}
+        second = await client.post("/candidate/create", headers=headers, json=payload)
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json()["uuid"] != first.json()["uuid"]
+
+    @pytest.mark.anyio
+    async def test_get_many_candidates(self, client, jwt_token):
+        """
+        Test case to retrieve several candidates at once and verify order and missing ids.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        first_id = await register_candidate(client, jwt_token)
+        payload = {**CANDIDATE_PAYLOAD, "email": "janedoe@example.com", "first_name": "Jane"}
+        second_id = (await client.post("/candidate/create", headers=headers, json=payload)).json()["uuid"]
+        missing_id = str(uuid.uuid4())
+
+        response = await client.post(
+            "/candidate/get-many", headers=headers, json={"uuids": [second_id, missing_id, first_id]}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [candidate["uuid"] for candidate in response.json()["candidates"]] == [second_id, first_id]
+        assert response.json()["missing"] == [missing_id]
+
+    @pytest.mark.anyio
+    async def test_candidate_ids_are_case_insensitive(self, client, jwt_token):
+        """
+        Test case to read a candidate with an upper case id and verify it is found like the canonical id.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+
+        response = await client.get(f"/candidate/get/{candidate_id.upper()}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["uuid"] == candidate_id
+
+        response = await client.post("/candidate/get-many", headers=headers, json={"uuids": [candidate_id.upper()]})
+        assert [candidate["uuid"] for candidate in response.json()["candidates"]] == [candidate_id]
+        assert response.json()["missing"] == []
+
+    @pytest.mark.anyio
+    async def test_get_many_candidates_limit(self, client, jwt_token):
+        """
+        Test case to request more candidates than allowed and verify the error response.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        uuids = [str(uuid.uuid4()) for _ in range(settings.CANDIDATE_BATCH_LIMIT + 1)]
+
+        response = await client.post("/candidate/get-many", headers=headers, json={"uuids": uuids})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.anyio
+    async def test_concurrent_gets_are_coalesced(self, client, jwt_token, monkeypatch):
+        """
+        Test case to issue concurrent single gets and verify they are served by one query.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+
+        batches = []
+
+        async def counting_fetch_candidates(candidate_ids, *callers):
+            batches.append(candidate_ids)
+            return await fetch_candidates(candidate_ids, *callers)
+
+        monkeypatch.setattr(views.candidates, "fetch_candidates", counting_fetch_candidates)
+        results = await asyncio.gather(
+            candidate_loader.load(candidate_id), candidate_loader.load(candidate_id), candidate_loader.load("unknown")
+        )
+        assert len(batches) == 1
+        assert results[0]["email"] == results[1]["email"] == CANDIDATE_PAYLOAD["email"]
+        assert results[2] is None
+
+    @pytest.mark.anyio
+    async def test_update_candidate_records_changed_fields_only(self, client, jwt_token):
+        """
+        Test case to update a candidate with a full form and verify only changed fields are recorded.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+
+        payload = {key: value for key, value in CANDIDATE_PAYLOAD.items() if key != "email"}
+        payload["city"] = "Amman"
+        response = await client.put(f"/candidate/update/{candidate_id}", headers=headers, json=payload)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["city"] == "Amman"
+
+        response = await client.put(f"/candidate/update/{candidate_id}", headers=headers, json=payload)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.get(f"/candidate/history/{candidate_id}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert [change["changes"] for change in response.json()] == [{"city": {"from": "City", "to": "Amman"}}]
+
+    @pytest.mark.anyio
+    async def test_history_is_kept_under_the_canonical_id(self, client, jwt_token):
+        """
+        Test case to update a candidate through differently spelled ids and verify one history is kept.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+
+        await client.put(f"/candidate/update/{candidate_id.upper()}", headers=headers, json={"city": "Amman"})
+        await client.put(f"/candidate/update/{candidate_id}", headers=headers, json={"city": "Irbid"})
+
+        response = await client.get(f"/candidate/history/{candidate_id.upper()}", headers=headers)
+        assert [change["changes"]["city"]["to"] for change in response.json()] == ["Irbid", "Amman"]
+
+    @pytest.mark.anyio
+    async def test_update_candidate_deleted_during_update(self, client, jwt_token, monkeypatch):
+        """
+        Test case to delete a candidate between the read and the write of an update and verify the error response.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+        build_candidate_update = views.candidates.build_candidate_update
+
+        async def delete_then_build(current, *args):
+            candidates_collection = await database.get_collection("candidates")
+            await candidates_collection.delete_many({})
+            return await build_candidate_update(current, *args)
+
+        monkeypatch.setattr("routes.candidates.build_candidate_update", delete_then_build)
+        response = await client.put(f"/candidate/update/{candidate_id}", headers=headers, json={"city": "Amman"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.anyio
+    async def test_concurrent_update_is_not_lost(self, client, jwt_token, monkeypatch):
+        """
+        Test case to update a candidate between the read and the write of another update and verify
+        the second update is recomputed against the first one.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+        build_candidate_update = views.candidates.build_candidate_update
+        interleaved = []
+
+        async def update_then_build(current, *args):
+            if not interleaved:
+                interleaved.append(True)
+                payload = {"city": "Irbid", "add_skills": ["Go"]}
+                response = await client.put(f"/candidate/update/{candidate_id}", headers=headers, json=payload)
+                assert response.status_code == status.HTTP_200_OK
+            return await build_candidate_update(current, *args)
+
+        monkeypatch.setattr("routes.candidates.build_candidate_update", update_then_build)
+        payload = {"city": "Amman", "add_skills": ["Rust"]}
+        response = await client.put(f"/candidate/update/{candidate_id}", headers=headers, json=payload)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["city"] == "Amman"
+        assert response.json()["skills"] == ["Python", "SQL", "Go", "Rust"]
+
+        response = await client.get(f"/candidate/history/{candidate_id}", headers=headers)
+        assert [change["changes"]["city"] for change in response.json()] == [
+            {"from": "Irbid", "to": "Amman"}, {"from": "City", "to": "Irbid"}
+        ]
+
+    @pytest.mark.anyio
+    async def test_update_candidate_conflict(self, client, jwt_token, monkeypatch):
+        """
+        Test case to keep updating a candidate during every attempt of another update and verify the error response.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+        build_candidate_update = views.candidates.build_candidate_update
+
+        async def bump_then_build(current, *args):
+            candidates_collection = await database.get_collection("candidates")
+            await candidates_collection.update_many({}, {"$inc": {REVISION_FIELD: 1}})
+            return await build_candidate_update(current, *args)
+
+        monkeypatch.setattr("routes.candidates.build_candidate_update", bump_then_build)
+        response = await client.put(f"/candidate/update/{candidate_id}", headers=headers, json={"city": "Amman"})
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = await client.get(f"/candidate/history/{candidate_id}", headers=headers)
+        assert response.json() == []
+
+    @pytest.mark.anyio
+    async def test_update_candidate_skills_as_set(self, client, jwt_token):
+        """
+        Test case to add and remove skills and verify the rest of the skills are kept.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+
+        payload = {"add_skills": ["Docker", "python"], "remove_skills": ["SQL"]}
+        response = await client.put(f"/candidate/update/{candidate_id}", headers=headers, json=payload)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["skills"] == ["Python", "Docker"]
+
+        response = await client.get(f"/candidate/history/{candidate_id}", headers=headers)
+        assert response.json()[0]["changes"] == {"skills": {"added": ["Docker"], "removed": ["SQL"]}}
+
+        payload = {"skills": ["Go"], "add_skills": ["Rust"]}
+        response = await client.put(f"/candidate/update/{candidate_id}", headers=headers, json=payload)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
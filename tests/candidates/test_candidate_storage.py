@@ -0,0 +1,139 @@
+import uuid
+
+import pytest
+from bson.binary import Binary
+from fastapi import status
+
+from database.db import database
+from tests.candidates.test_candidate_endpoints import CANDIDATE_PAYLOAD, register_candidate
+from views.candidate_storage import ENUM_FIELDS, check_enum_codes, encode_fields
+from views.jobs import process_next_job
+
+
+class TestCandidateStorage:
+
+    @pytest.mark.anyio
+    async def test_candidate_is_stored_compact(self, client, jwt_token):
+        """
+        Test case to register a candidate and verify the compact storage form round trips.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = await register_candidate(client, jwt_token)
+
+        candidates_collection = await database.get_collection("candidates")
+        document = await candidates_collection.find_one({"email": CANDIDATE_PAYLOAD["email"]})
+        assert document["_v"] == 2
+        assert isinstance(document["uuid"], Binary)
+        assert document["career_level"] == 1
+        assert all(isinstance(skill, int) for skill in document["skills"])
+        assert isinstance(document["city"], int)
+
+        response = await client.get(f"/candidate/get/{candidate_id}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["uuid"] == candidate_id
+        assert response.json()["career_level"] == "Senior"
+        assert response.json()["skills"] == ["Python", "SQL"]
+        assert response.json()["city"] == "City"
+
+    @pytest.mark.anyio
+    async def test_skills_are_normalized(self, client, jwt_token):
+        """
+        Test case to verify skill spellings that differ in case or spacing are stored once.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        payload = {**CANDIDATE_PAYLOAD, "skills": ["Python", " python ", "Machine   Learning"]}
+        response = await client.post("/candidate/create", headers=headers, json=payload)
+        candidate_id = response.json()["uuid"]
+
+        response = await client.get(f"/candidate/get/{candidate_id}", headers=headers)
+        assert response.json()["skills"] == ["Python", "Machine Learning"]
+
+    @pytest.mark.anyio
+    async def test_city_and_nationality_keep_their_spelling(self, client, jwt_token):
+        """
+        Test case to verify cities and nationalities differing only in case are stored as given.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        payload = {**CANDIDATE_PAYLOAD, "city": "Amman", "nationality": "Jordanian"}
+        await client.post("/candidate/create", headers=headers, json=payload)
+        payload = {**CANDIDATE_PAYLOAD, "email": "other@gmail.com", "city": "AMMAN", "nationality": "jordanian"}
+        response = await client.post("/candidate/create", headers=headers, json=payload)
+        candidate_id = response.json()["uuid"]
+
+        response = await client.get(f"/candidate/get/{candidate_id}", headers=headers)
+        assert response.json()["city"] == "AMMAN"
+        assert response.json()["nationality"] == "jordanian"
+
+    @pytest.mark.anyio
+    async def test_candidate_uuid_is_indexed(self, client, jwt_token):
+        """
+        Test case to verify uuid lookups are served by a unique index.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        response = await client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD)
+        assert response.status_code == status.HTTP_200_OK
+
+        candidates_collection = await database.get_collection("candidates")
+        indexes = await candidates_collection.index_information()
+        assert any(index["key"] == [("uuid", 1)] and index.get("unique") for index in indexes.values())
+
+    @pytest.mark.anyio
+    async def test_legacy_candidate_is_upgraded_on_read(self, client, jwt_token):
+        """
+        Test case to read a candidate stored before the compact schema and verify it is migrated.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidate_id = str(uuid.uuid4())
+        candidates_collection = await database.get_collection("candidates")
+        await candidates_collection.insert_one({**CANDIDATE_PAYLOAD, "uuid": candidate_id})
+
+        response = await client.post("/candidate/all-candidates", headers=headers, json={"city": "City"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["uuid"] == candidate_id
+
+        response = await client.get(f"/candidate/get/{candidate_id}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["gender"] == "Male"
+
+        document = await candidates_collection.find_one({"email": CANDIDATE_PAYLOAD["email"]})
+        assert document["_v"] == 2
+        assert document["gender"] == 0
+
+        response = await client.post("/candidate/all-candidates", headers=headers, json={"skills": "SQL"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["uuid"] == candidate_id
+
+    @pytest.mark.anyio
+    async def test_storage_migration_job_reports_sizes(self, client, jwt_token):
+        """
+        Test case to migrate legacy candidates on the worker and verify the before and after report.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        candidates_collection = await database.get_collection("candidates")
+        await candidates_collection.insert_one({**CANDIDATE_PAYLOAD, "uuid": str(uuid.uuid4())})
+
+        response = await client.post("/candidate/migrate-storage", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        job_data = await process_next_job()
+        assert job_data["status"] == "completed"
+        assert job_data["result"]["upgraded"] == 1
+        assert job_data["result"]["before"]["compact_documents"] == 0
+        assert job_data["result"]["after"]["compact_documents"] == 1
+        assert job_data["result"]["after"]["avg_document_bytes"] < job_data["result"]["before"]["avg_document_bytes"]
+
+        response = await client.get("/candidate/storage-report", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["documents"] == 1
+
+    @pytest.mark.anyio
+    async def test_enum_codes_are_fixed(self, monkeypatch):
+        """
+        Test case to verify enum codes come from the frozen mapping and unmapped schema values are rejected.
+        """
+        encoded = await encode_fields({"career_level": "Mid Level", "degree_type": "High School", "gender": "Female"})
+        assert encoded == {"career_level": 2, "degree_type": 2, "gender": 1}
+
+        monkeypatch.setitem(ENUM_FIELDS, "career_level", {"Junior": 0, "Senior": 1})
+        with pytest.raises(RuntimeError):
+            check_enum_codes()
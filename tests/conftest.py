@@ -1,9 +1,14 @@
+import asyncio
 import uuid
 
 import pytest
 from app import app
+from configurations.config import settings
 from database.db import database
 from httpx import AsyncClient
+from utils.loop_monitor import LoopBlockingMonitor
+from views import audit, candidates, idempotency, jobs, users
+from views.candidate_storage import clear_interned_cache
 from views.users import create_access_token, hash_password
 
 
@@ -24,12 +29,44 @@ async def client():
         yield client
 
 
+@pytest.fixture(scope="session")
+async def loop_monitor(client):
+    """
+    Fixture to record event loop blocking callbacks during the whole test session.
+
+    Depends on `client` so the session event loop outlives both fixtures.
+    """
+    monitor = LoopBlockingMonitor(threshold=settings.LOOP_BLOCKING_BUDGET_MS / 1000)
+    monitor.install(asyncio.get_running_loop())
+    yield monitor
+    monitor.uninstall()
+
+
+@pytest.fixture(autouse=True)
+async def fail_on_loop_blocking(loop_monitor):
+    """
+    Fixture to fail a test when one of its requests blocks the event loop longer than the budget.
+    """
+    loop_monitor.events.clear()
+    yield
+    blocking = loop_monitor.blocking_requests()
+    assert not blocking, "Requests blocked the event loop:\n" + "\n".join(
+        f"{event['route']} {event['duration_ms']}ms\n{''.join(event['stack'] or [])}" for event in blocking
+    )
+
+
 @pytest.fixture(autouse=True)
 async def drop_database():
     """
     Fixture to drop the test database before each test function.
     """
-    database.drop_database()
+    await database.drop_database()
+    clear_interned_cache()
+    # Dropping the database drops its indexes as well.
+    for module in (audit, idempotency, jobs, users):
+        module._indexes_created = False
+    candidates._candidate_indexes_created = False
+    candidates._history_indexes_created = False
 
 
 @pytest.fixture()
@@ -0,0 +1,184 @@
+import httpx
+import pytest
+from bson.timestamp import Timestamp
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+from configurations.config import settings
+from database.db import CausalTokenMiddleware, Database, database, decode_causal_token, encode_causal_token
+from tests.candidates.test_candidate_endpoints import CANDIDATE_PAYLOAD
+
+
+class FakeCausalSession:
+    """
+    Session stand-in recording the times it is advanced to, for servers without a replica set.
+    """
+
+    def __init__(self) -> None:
+        self.cluster_time = None
+        self.operation_time = None
+
+    async def __aenter__(self) -> "FakeCausalSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    def advance_cluster_time(self, cluster_time) -> None:
+        if self.cluster_time is None or cluster_time["clusterTime"] > self.cluster_time["clusterTime"]:
+            self.cluster_time = cluster_time
+
+    def advance_operation_time(self, operation_time) -> None:
+        if self.operation_time is None or operation_time > self.operation_time:
+            self.operation_time = operation_time
+
+    def write(self, operation_time: Timestamp) -> None:
+        """
+        Move the session forward as a write acknowledged at `operation_time` would.
+        """
+        self.advance_cluster_time({"clusterTime": operation_time, "signature": {"keyId": 0}})
+        self.advance_operation_time(operation_time)
+
+
+@pytest.fixture
+def fake_sessions(monkeypatch):
+    """
+    Make `Database.causal_session` start `FakeCausalSession`s, and collect them.
+    """
+    sessions = []
+
+    async def start_session(**kwargs):
+        sessions.append(FakeCausalSession())
+        return sessions[-1]
+
+    monkeypatch.setattr(database.client, "start_session", start_session)
+    monkeypatch.setattr(Database, "_caller_times", type(Database._caller_times)())
+    return sessions
+
+
+class TestReadRouting:
+
+    @pytest.mark.anyio
+    async def test_search_reads_go_to_secondaries(self):
+        """
+        Test case to verify configured reads use a secondary with bounded staleness.
+        """
+        collection = await database.get_collection("candidates", "search")
+        assert collection.read_preference == SecondaryPreferred(max_staleness=settings.MAX_STALENESS_SECONDS)
+
+    @pytest.mark.anyio
+    async def test_unconfigured_operations_go_to_primary(self):
+        """
+        Test case to verify writes and unconfigured reads use the primary.
+        """
+        collection = await database.get_collection("candidates")
+        assert collection.read_preference == Primary()
+
+        collection = await database.get_collection("candidates", "read")
+        assert collection.read_preference == Primary()
+
+    @pytest.mark.anyio
+    async def test_causal_session_continues_from_callers_last_write(self):
+        """
+        Test case to verify a caller's next session starts after their last write.
+        """
+        hello = await database.client.admin.command("hello")
+        if not hello.get("setName"):
+            pytest.skip("causal sessions need the replica set stand-in from docker-compose")
+
+        candidates_collection = await database.get_collection("candidates")
+        async with database.causal_session("caller") as session:
+            await candidates_collection.insert_one({"uuid": "causal"}, session=session)
+            write_time = session.operation_time
+
+        assert Database._caller_times["caller"][1] == write_time
+
+        search_collection = await database.get_collection("candidates", "search")
+        async with database.causal_session("caller") as session:
+            assert session.operation_time >= write_time
+            assert await search_collection.find_one({"uuid": "causal"}, session=session)
+
+    @pytest.mark.anyio
+    async def test_caller_times_are_handed_to_the_next_session(self, fake_sessions):
+        """
+        Test case to verify, with a fake session, that a caller's next session is advanced to their last write.
+        """
+        write_time = Timestamp(1700000000, 5)
+        async with database.causal_session("caller") as session:
+            session.write(write_time)
+
+        assert Database._caller_times["caller"][1] == write_time
+
+        async with database.causal_session("caller") as session:
+            assert session.operation_time == write_time
+            assert session.cluster_time["clusterTime"] == write_time
+
+        async with database.causal_session("someone else") as session:
+            assert session.operation_time is None
+
+    @pytest.mark.anyio
+    async def test_causal_token_is_handed_between_requests(self, fake_sessions):
+        """
+        Test case to verify, with a fake session, that the token of a write response advances the next request.
+        """
+        write_time = Timestamp(1700000000, 7)
+
+        async def app(scope, receive, send):
+            async with database.causal_session() as session:
+                if scope["path"] == "/write":
+                    session.write(write_time)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async with httpx.AsyncClient(app=CausalTokenMiddleware(app), base_url="http://test") as client:
+            response = await client.get("/read")
+            assert "X-Causal-Token" not in response.headers
+
+            response = await client.get("/write")
+            token = response.headers["X-Causal-Token"]
+            assert decode_causal_token(token)[1] == write_time
+
+            response = await client.get("/read", headers={"X-Causal-Token": token})
+            assert fake_sessions[-1].operation_time == write_time
+            assert fake_sessions[-1].cluster_time["clusterTime"] == write_time
+            assert decode_causal_token(response.headers["X-Causal-Token"])[1] == write_time
+
+    @pytest.mark.anyio
+    async def test_causal_token_round_trip(self):
+        """
+        Test case to encode session times as a client token and decode them back.
+        """
+        cluster_time = {"clusterTime": Timestamp(1700000000, 3), "signature": {"keyId": 0}}
+        operation_time = Timestamp(1700000000, 2)
+
+        token = encode_causal_token((cluster_time, operation_time))
+        assert decode_causal_token(token) == (cluster_time, operation_time)
+
+    @pytest.mark.anyio
+    async def test_invalid_causal_token_is_ignored(self):
+        """
+        Test case to verify malformed tokens are treated as missing.
+        """
+        assert decode_causal_token(None) is None
+        assert decode_causal_token("not a token") is None
+        assert decode_causal_token(encode_causal_token(({"clusterTime": 1}, Timestamp(1, 1)))) is None
+
+    @pytest.mark.anyio
+    async def test_causal_token_is_returned_and_continued(self, client, jwt_token):
+        """
+        Test case to write through the API and verify the returned token carries the write time to the next request.
+        """
+        hello = await database.client.admin.command("hello")
+        if not hello.get("setName"):
+            pytest.skip("causal sessions need the replica set stand-in from docker-compose")
+
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        response = await client.post("/candidate/create", headers=headers, json=CANDIDATE_PAYLOAD)
+        token = response.headers["X-Causal-Token"]
+        write_time = decode_causal_token(token)[1]
+
+        Database._caller_times.clear()
+        response = await client.post(
+            "/candidate/all-candidates", headers={**headers, "X-Causal-Token": token}, json={}
+        )
+        assert response.json()[0]["uuid"]
+        assert decode_causal_token(response.headers["X-Causal-Token"])[1] >= write_time
@@ -0,0 +1,218 @@
+import csv
+import glob
+import os
+import shutil
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from tests.candidates.test_candidate_endpoints import CANDIDATE_PAYLOAD, register_candidate
+from views.jobs import JOB_HANDLERS, LEASE_EXPIRED, enqueue_job, get_job_queue, job, process_next_job
+
+
+@job("always_failing")
+async def always_failing_job(context, payload):
+    """
+    Job used to exercise retries.
+    """
+    raise RuntimeError("boom")
+
+
+@job("noop")
+async def noop_job(context, payload):
+    """
+    Job used to exercise leases.
+    """
+    return {"done": True}
+
+
+@job("overtaken")
+async def overtaken_job(context, payload):
+    """
+    Job used to exercise lease fencing: its first attempt is overtaken by a second worker.
+    """
+    if context.attempt == 1:
+        await context.queue.update(context.job_id, {"lease_until": datetime.utcnow() - timedelta(seconds=1)})
+        await process_next_job()
+        await context.report_progress(50)
+    return {"attempt": context.attempt}
+
+
+class TestJobs:
+
+    @pytest.mark.anyio
+    async def test_csv_report_job_runs_on_worker(self, client, jwt_token):
+        """
+        Test case to queue a CSV report, run it on the worker and verify the job result.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        await register_candidate(client, jwt_token)
+
+        response = await client.get("/candidate/generate-csv-report", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        job_id = response.json()["job_id"]
+
+        response = await client.get(f"/job/get/{job_id}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "queued"
+
+        await process_next_job()
+
+        response = await client.get(f"/job/get/{job_id}", headers=headers)
+        assert response.json()["status"] == "completed"
+        assert response.json()["progress"] == 100
+        assert response.json()["result"]["candidates"] == 1
+        os.remove(response.json()["result"]["file_name"])
+
+    @pytest.mark.anyio
+    async def test_parquet_export_partitioned_by_nationality(self, client, jwt_token):
+        """
+        Test case to export candidates to Parquet partitioned by nationality and read the dataset back.
+        """
+        parquet = pytest.importorskip("pyarrow.parquet")
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        await register_candidate(client, jwt_token)
+        payload = {**CANDIDATE_PAYLOAD, "email": "janedoe@example.com", "nationality": "Jordan"}
+        await client.post("/candidate/create", headers=headers, json=payload)
+
+        response = await client.post(
+            "/candidate/export", headers=headers, json={"format": "parquet", "partition_by": "nationality"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        job_data = await process_next_job()
+        result = job_data["result"]
+        assert job_data["status"] == "completed"
+        assert result == {"path": result["path"], "format": "parquet", "files": 2, "rows": 2}
+
+        table = parquet.read_table(os.path.join(result["path"], "nationality=Jordan"))
+        assert table.column("email").to_pylist() == ["janedoe@example.com"]
+        assert table.column("skills").to_pylist() == [["Python", "SQL"]]
+        shutil.rmtree(result["path"])
+
+    @pytest.mark.anyio
+    async def test_parquet_export_without_pyarrow(self, client, jwt_token, monkeypatch):
+        """
+        Test case to request a Parquet export without pyarrow and verify it is rejected instead of written as CSV.
+        """
+        monkeypatch.setattr("views.exports.pyarrow", None)
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+
+        response = await client.post("/candidate/export", headers=headers, json={"format": "parquet"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert await process_next_job() is None
+
+    @pytest.mark.anyio
+    async def test_csv_export(self, client, jwt_token):
+        """
+        Test case to export candidates to CSV and verify the explicit header.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        await register_candidate(client, jwt_token)
+
+        response = await client.post("/candidate/export", headers=headers, json={"format": "csv"})
+        assert response.status_code == status.HTTP_200_OK
+
+        result = (await process_next_job())["result"]
+        [path] = glob.glob(os.path.join(result["path"], "*.csv"))
+        with open(path, newline="") as file:
+            [row] = list(csv.DictReader(file))
+        assert row["uuid"]
+        assert row["skills"] == "Python|SQL"
+        shutil.rmtree(result["path"])
+
+    @pytest.mark.anyio
+    async def test_cancel_queued_job(self, client, jwt_token):
+        """
+        Test case to cancel a queued job and verify the worker skips it.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        job_data = await enqueue_job("csv_report")
+
+        response = await client.post(f"/job/cancel/{job_data['job_id']}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "cancelled"
+
+        assert await process_next_job() is None
+
+        response = await client.post(f"/job/cancel/{job_data['job_id']}", headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.anyio
+    async def test_failed_job_is_retried_with_backoff(self, client, jwt_token):
+        """
+        Test case to run a failing job and verify it is queued again for a later retry.
+        """
+        assert "always_failing" in JOB_HANDLERS
+        job_data = await enqueue_job("always_failing")
+
+        retried = await process_next_job()
+        assert retried["status"] == "queued"
+        assert retried["attempts"] == 1
+        assert retried["error"] == "boom"
+        assert retried["run_at"] > job_data["run_at"]
+
+        assert await process_next_job() is None
+
+    @pytest.mark.anyio
+    async def test_job_of_a_dead_worker_is_claimed_again(self, client, jwt_token):
+        """
+        Test case to abandon a running job and verify another worker runs it once the lease expires.
+        """
+        queue = get_job_queue()
+        job_data = await enqueue_job("noop")
+        claimed = await queue.claim()
+        assert claimed["job_id"] == job_data["job_id"]
+        assert claimed["lease_until"] > datetime.utcnow()
+
+        assert await process_next_job() is None
+
+        await queue.update(job_data["job_id"], {"lease_until": datetime.utcnow() - timedelta(seconds=1)})
+        finished = await process_next_job()
+        assert finished["status"] == "completed"
+        assert finished["attempts"] == 2
+
+    @pytest.mark.anyio
+    async def test_job_fails_after_too_many_expired_leases(self, client, jwt_token):
+        """
+        Test case to expire the lease of a job on its last attempt and verify it is marked as failed.
+        """
+        queue = get_job_queue()
+        job_data = await enqueue_job("noop")
+        await queue.update(job_data["job_id"], {
+            "status": "running",
+            "attempts": job_data["max_attempts"],
+            "lease_until": datetime.utcnow() - timedelta(seconds=1),
+        })
+
+        failed = await process_next_job()
+        assert failed["status"] == "failed"
+        assert failed["error"] == LEASE_EXPIRED
+
+    @pytest.mark.anyio
+    async def test_worker_that_lost_its_lease_stops(self, client, jwt_token):
+        """
+        Test case to reclaim a job while its first worker still runs and verify the first worker
+        stops without overwriting the second attempt.
+        """
+        queue = get_job_queue()
+        job_data = await enqueue_job("overtaken")
+
+        assert await process_next_job() is None
+
+        finished = await queue.get(job_data["job_id"])
+        assert finished["status"] == "completed"
+        assert finished["attempts"] == 2
+        assert finished["progress"] == 100
+        assert finished["result"] == {"attempt": 2}
+        assert await queue.update(job_data["job_id"], {"status": "failed"}, attempt=1) is None
+
+    @pytest.mark.anyio
+    async def test_get_unknown_job(self, client, jwt_token):
+        """
+        Test case to retrieve a job that does not exist.
+        """
+        headers = {"Authorization": f"Bearer {jwt_token}"}
+        response = await client.get("/job/get/unknown", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
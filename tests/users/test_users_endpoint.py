@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from fastapi import status
 
@@ -46,6 +48,41 @@ class TestUsers:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.json()["detail"] == "Email already exists"
 
+    @pytest.mark.anyio
+    async def test_register_user_concurrently_with_same_email(self, client):
+        """
+        Test case to register one email twice at the same time and verify only one user is created.
+        """
+        payload = {
+            "first_name": "string",
+            "last_name": "string",
+            "email": "user+2@example.com",
+            "password": "12345678"
+        }
+        responses = await asyncio.gather(*[client.post("/user/register", json=payload) for _ in range(2)])
+        assert sorted(response.status_code for response in responses) == [200, 400]
+        rejected = next(response for response in responses if response.status_code == 400)
+        assert rejected.json()["detail"] == "Email already exists"
+
+    @pytest.mark.anyio
+    async def test_register_user_replay_with_idempotency_key(self, client):
+        """
+        Test case to retry a registration with an idempotency key and verify the first response is replayed.
+        """
+        headers = {"Idempotency-Key": "register-user-2"}
+        payload = {
+            "first_name": "string",
+            "last_name": "string",
+            "email": "user+2@example.com",
+            "password": "12345678"
+        }
+        response = await client.post("/user/register", headers=headers, json=payload)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.post("/user/register", headers=headers, json=payload)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["message"] == "User Registered Successfully"
+
     @pytest.mark.anyio
     async def test_login_user(self, client):
         """
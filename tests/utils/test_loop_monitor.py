@@ -0,0 +1,57 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from utils.loop_monitor import LoopMonitorMiddleware
+
+blocking_app = FastAPI()
+blocking_app.add_middleware(LoopMonitorMiddleware)
+
+
+@blocking_app.get("/block/{seconds}")
+async def block_loop(seconds: float):
+    """
+    Endpoint blocking the event loop with a synchronous sleep.
+    """
+    time.sleep(seconds)
+    return {"slept": seconds}
+
+
+class TestLoopMonitor:
+
+    @pytest.mark.anyio
+    async def test_blocking_request_is_attributed_to_route(self, loop_monitor, tmp_path):
+        """
+        Test case to block the loop inside a request and verify the route, duration and stack are recorded.
+        """
+        seconds = 2 * loop_monitor.threshold
+        async with AsyncClient(app=blocking_app, base_url="http://test") as client:
+            response = await client.get(f"/block/{seconds}")
+        assert response.status_code == 200
+        await asyncio.sleep(0)
+
+        [event] = loop_monitor.blocking_requests()
+        assert event["route"] == "GET /block/{seconds}"
+        assert event["duration_ms"] >= seconds * 1000
+        assert any("time.sleep(seconds)" in line for line in event["stack"])
+
+        report_path = tmp_path / "loop_report.json"
+        loop_monitor.export(str(report_path))
+        report = json.loads(report_path.read_text())
+        assert report["routes"]["GET /block/{seconds}"]["count"] == 1
+
+        loop_monitor.events.clear()
+
+    @pytest.mark.anyio
+    async def test_blocking_outside_requests_is_not_attributed(self, loop_monitor):
+        """
+        Test case to block the loop outside of a request and verify it does not count against the budget.
+        """
+        time.sleep(2 * loop_monitor.threshold)
+        await asyncio.sleep(0)
+        assert any(event["route"] is None for event in loop_monitor.events)
+        assert loop_monitor.blocking_requests() == []
@@ -5,3 +5,10 @@ USER_REGISTERED_SUCCESSFULLY = "User Registered Successfully"
 INCORRECT_EMAIL_PASSWORD = "Incorrect email or password"
 CANDIDATE_REGISTERED_SUCCESSFULLY = "Candidate Registered Successfully"
 RECORD_DELETED_SUCCESSFULLY = "Record deleted successfully"
+IDEMPOTENCY_KEY_REUSED = "Idempotency key was already used with a different payload"
+IDEMPOTENCY_KEY_IN_PROGRESS = "A request with this idempotency key is still in progress"
+JOB_QUEUED = "Job queued successfully"
+JOB_CANNOT_BE_CANCELLED = "Job has already finished"
+SKILLS_UPDATE_CONFLICT = "Use either skills or add_skills/remove_skills, not both"
+CANDIDATE_UPDATE_CONFLICT = "Candidate is being updated by another request, try again"
+PARQUET_UNAVAILABLE = "Parquet export needs pyarrow, which is not installed"
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# ASGI scope of the request whose code is running, read back from the context of each loop callback.
+current_request: ContextVar[Optional[Dict[str, Any]]] = ContextVar("current_request", default=None)
+
+
+def route_label(scope: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Describe the request of an ASGI scope by method and route template.
+
+    Args:
+        scope: Optional[Dict[str, Any]] - The ASGI scope, once routed it holds the matched route.
+
+    Returns:
+        Optional[str]: e.g. "GET /candidate/get/{candidate_id}", None outside of a request.
+    """
+    if scope is None:
+        return None
+    path: str = getattr(scope.get("route"), "path", scope.get("path"))
+    return f"{scope.get('method')} {path}"
+
+
+def request_scope(handle: asyncio.Handle) -> Optional[Dict[str, Any]]:
+    """
+    Get the request a loop callback currently runs for.
+
+    A request served inline by the caller's task, as in tests, only sets the scope for part of a
+    callback, so it is read when the callback starts, while it is sampled and when it ends.
+
+    Args:
+        handle: asyncio.Handle - The loop callback.
+
+    Returns:
+        Optional[Dict[str, Any]]: The ASGI scope, None outside of a request.
+    """
+    context = getattr(handle, "_context", None)
+    return context.get(current_request) if context is not None else None
+
+
+class LoopMonitorMiddleware:
+    """
+    ASGI middleware tagging the code that runs for a request with its scope, so loop
+    blocking can be attributed to a route.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_request.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+
+
+class LoopBlockingMonitor:
+    """
+    Detect event loop callbacks that run longer than a threshold.
+
+    Installing it turns on asyncio debug mode with the same slow callback threshold, times every
+    callback of the loop and, while a callback is still running past the threshold, samples the
+    stack of the loop thread from a watchdog thread. Each slow callback is recorded with its
+    duration, the route of the request it belongs to and the sampled stack.
+    """
+
+    def __init__(self, threshold: float, stack_depth: int = 15) -> None:
+        self.threshold = threshold
+        self.stack_depth = stack_depth
+        self.events: List[Dict[str, Any]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._running: Optional[tuple] = None
+        self._sample: Optional[tuple] = None
+        self._original_run = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def install(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Start monitoring a loop. Must be called from the thread running it.
+
+        Args:
+            loop: asyncio.AbstractEventLoop - The loop to monitor.
+        """
+        if self._loop is not None:
+            return
+
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.threshold
+
+        monitor: LoopBlockingMonitor = self
+        original_run = self._original_run = asyncio.Handle._run
+
+        def _run(handle: asyncio.Handle) -> None:
+            if handle._loop is not monitor._loop:
+                return original_run(handle)
+
+            start: float = time.perf_counter()
+            monitor._running = (handle, start)
+            scope: Optional[Dict[str, Any]] = request_scope(handle)
+            try:
+                return original_run(handle)
+            finally:
+                monitor._running = None
+                duration: float = time.perf_counter() - start
+                if duration >= monitor.threshold:
+                    sample: Optional[tuple] = monitor._sample
+                    stack: Optional[List[str]] = None
+                    if sample is not None and sample[0] is handle:
+                        scope, stack = scope or sample[1], sample[2]
+                    monitor._record(handle, duration, scope or request_scope(handle), stack)
+
+        asyncio.Handle._run = _run
+
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    def uninstall(self) -> None:
+        """
+        Stop monitoring and restore the loop settings.
+        """
+        if self._loop is None:
+            return
+
+        asyncio.Handle._run = self._original_run
+        self._stop.set()
+        self._watchdog.join()
+        self._loop.set_debug(False)
+        self._loop = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 4):
+            running: Optional[tuple] = self._running
+            if running is None or time.perf_counter() - running[1] < self.threshold:
+                continue
+            if self._sample is not None and self._sample[0] is running[0]:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                stack: List[str] = traceback.format_stack(frame, limit=self.stack_depth)
+                self._sample = (running[0], request_scope(running[0]), stack)
+
+    def _record(
+            self, handle: asyncio.Handle, duration: float, scope: Optional[Dict[str, Any]], stack: Optional[List[str]]
+    ) -> None:
+        self.events.append({
+            "route": route_label(scope),
+            "duration_ms": round(duration * 1000, 2),
+            "callback": repr(handle),
+            "stack": stack,
+            "recorded_at": time.time(),
+        })
+
+    def blocking_requests(self, budget: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get the slow callbacks that ran for a request.
+
+        Args:
+            budget: Optional[float] - Only return callbacks longer than this many seconds, defaults to the threshold.
+
+        Returns:
+            List[Dict[str, Any]]: The matching events.
+        """
+        budget = self.threshold if budget is None else budget
+        return [
+            event for event in self.events
+            if event["route"] is not None and event["duration_ms"] >= budget * 1000
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the recorded slow callbacks per route.
+
+        Returns:
+            Dict[str, Any]: The threshold, per route count, total and worst duration, and every event.
+        """
+        routes: Dict[str, Dict[str, Any]] = {}
+        for event in self.events:
+            summary: Dict[str, Any] = routes.setdefault(
+                event["route"] or "<no request>", {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            summary["count"] += 1
+            summary["total_ms"] = round(summary["total_ms"] + event["duration_ms"], 2)
+            summary["max_ms"] = max(summary["max_ms"], event["duration_ms"])
+
+        return {"threshold_ms": self.threshold * 1000, "routes": routes, "events": self.events}
+
+    def export(self, path: str) -> None:
+        """
+        Write the report as JSON.
+
+        Args:
+            path: str - The report file.
+        """
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
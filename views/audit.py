@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from configurations.config import settings
+from database.db import database
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+logger = logging.getLogger(__name__)
+
+AUDIT_WRITE_ATTEMPTS = 3
+
+# Fields the audit query endpoint filters on, each indexed together with the event time.
+AUDIT_QUERY_FIELDS = ("action", "actor", "target")
+
+# Queued by `AuditLog.flush` so the writer stops waiting for a full batch.
+FLUSH = object()
+
+_indexes_created: bool = False
+
+
+async def get_audit_collection() -> AsyncIOMotorCollection:
+    """
+    Get the audit events collection, creating its indexes on first use.
+
+    Returns:
+        AsyncIOMotorCollection: The audit events collection.
+    """
+    global _indexes_created
+
+    collection: AsyncIOMotorCollection = await database.get_collection("audit_events")
+    if not _indexes_created:
+        await collection.create_index([("created_at", -1)])
+        for field in AUDIT_QUERY_FIELDS:
+            await collection.create_index([(field, 1), ("created_at", -1)])
+        _indexes_created = True
+    return collection
+
+
+class MongoAuditSink:
+    """
+    Write audit events to the `audit_events` collection.
+    """
+
+    async def write(self, events: List[Dict[str, Any]]) -> None:
+        collection: AsyncIOMotorCollection = await get_audit_collection()
+        await collection.insert_many([dict(event) for event in events], ordered=False)
+
+    async def query(self, filters: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        collection: AsyncIOMotorCollection = await get_audit_collection()
+        return await collection.find(filters, {"_id": 0}).sort("created_at", -1).to_list(length=limit)
+
+
+class FileAuditSink:
+    """
+    Append audit events as JSON lines to a local file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def _append(self, events: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a") as file:
+            file.writelines(json.dumps(event, default=str) + "\n" for event in events)
+
+    def _read(self, filters: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path) as file:
+                events: List[Dict] = [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+        matching: List[Dict] = [
+            event for event in reversed(events)
+            if all(event.get(field) == value for field, value in filters.items())
+        ]
+        return matching[:limit]
+
+    async def write(self, events: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._append, events)
+
+    async def query(self, filters: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._read, filters, limit)
+
+
+class AuditLog:
+    """
+    Bounded in-process buffer of audit events, written in batches by a background task.
+    """
+
+    def __init__(self, sink, max_size: int, batch_size: int, flush_interval: float) -> None:
+        self.sink = sink
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._task = asyncio.create_task(self._run())
+        return self._queue
+
+    async def record(
+            self, action: str, actor: Optional[str] = None, target: Optional[str] = None, **details: Any
+    ) -> None:
+        """
+        Add an event to the buffer, waiting for the writer only when the buffer is full.
+
+        Args:
+            action: str - What happened, e.g. "candidate.create".
+            actor: Optional[str] - Who did it, usually the user email.
+            target: Optional[str] - What it was done to, e.g. the candidate uuid.
+            **details: Any - Extra event fields.
+        """
+        queue: asyncio.Queue = self._ensure_started()
+        event: Dict[str, Any] = {
+            "action": action,
+            "actor": actor,
+            "target": target,
+            "details": details,
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            await queue.put(event)
+
+    async def _run(self) -> None:
+        queue: asyncio.Queue = self._queue
+        while True:
+            items: List[Any] = [await queue.get()]
+            if items[0] is not FLUSH:
+                try:
+                    await asyncio.wait_for(self._fill(queue, items), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            events: List[Dict] = [item for item in items if item is not FLUSH]
+            if events:
+                await self._write(events)
+            for _ in items:
+                queue.task_done()
+
+    async def _fill(self, queue: asyncio.Queue, items: List[Any]) -> None:
+        while len(items) < self.batch_size:
+            item: Any = queue.get_nowait() if not queue.empty() else await queue.get()
+            items.append(item)
+            if item is FLUSH:
+                return
+
+    async def _write(self, batch: List[Dict]) -> None:
+        for attempt in range(1, AUDIT_WRITE_ATTEMPTS + 1):
+            try:
+                await self.sink.write(batch)
+                return
+            except Exception:
+                logger.exception("Writing %d audit events failed (attempt %d)", len(batch), attempt)
+                await asyncio.sleep(self.flush_interval)
+        logger.error("Dropped %d audit events", len(batch))
+
+    async def flush(self) -> None:
+        """
+        Wait until every buffered event has been written.
+        """
+        if self._task is not None and not self._task.done():
+            try:
+                self._queue.put_nowait(FLUSH)
+            except asyncio.QueueFull:
+                pass
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """
+        Flush the buffer and stop the background writer.
+        """
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def query(self, filters: Dict[str, Any], limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Flush the buffer and return the latest matching events.
+
+        Args:
+            filters: Dict[str, Any] - Field to value filters.
+            limit: int - Maximum number of events returned.
+
+        Returns:
+            List[Dict[str, Any]]: The events, newest first.
+        """
+        await self.flush()
+        return await self.sink.query(filters, limit)
+
+
+audit_log: AuditLog = AuditLog(
+    sink=FileAuditSink(settings.AUDIT_LOG_FILE) if settings.AUDIT_LOG_BACKEND == "file" else MongoAuditSink(),
+    max_size=settings.AUDIT_BUFFER_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+)
@@ -0,0 +1,434 @@
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, get_args
+
+import bson
+from bson.binary import Binary, UuidRepresentation
+from database.db import database
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from schemas.candidates_schema import CandidateRegisterRequestSchema
+from views.jobs import JobContext, job
+
+STORAGE_VERSION = 2
+VERSION_FIELD = "_v"
+# Incremented by every candidate update, so an update only applies to the revision it was computed from.
+REVISION_FIELD = "_rev"
+
+# Stored codes of the enum fields. They are persisted, so existing codes must never change;
+# give new values the next free code.
+ENUM_FIELDS: Dict[str, Dict[str, int]] = {
+    "career_level": {"Junior": 0, "Senior": 1, "Mid Level": 2},
+    "degree_type": {"Bachelor": 0, "Master": 1, "High School": 2},
+    "gender": {"Male": 0, "Female": 1, "Not Specified": 2},
+}
+ENUM_LABELS: Dict[str, Dict[int, str]] = {
+    field: {code: label for label, code in codes.items()} for field, codes in ENUM_FIELDS.items()
+}
+INTERNED_FIELDS: Tuple[str, ...] = ("nationality", "city")
+SKILLS_FIELD = "skills"
+
+
+def check_enum_codes() -> None:
+    """
+    Verify every value the candidate schema accepts for an enum field has a stored code.
+
+    Raises:
+        RuntimeError: If a schema value has no code.
+    """
+    for field, codes in ENUM_FIELDS.items():
+        missing: List[str] = [
+            value for value in get_args(CandidateRegisterRequestSchema.model_fields[field].annotation)
+            if value not in codes
+        ]
+        if missing:
+            raise RuntimeError(f"No storage code for {field} values {missing}, add them to ENUM_FIELDS")
+
+
+check_enum_codes()
+
+_codes: Dict[Tuple[str, str], int] = {}
+_labels: Dict[Tuple[str, int], str] = {}
+_indexes_created: bool = False
+
+
+def normalize_value(value: str) -> str:
+    """
+    Collapse whitespace so the same value is always stored once.
+
+    Args:
+        value: str - The value to normalize.
+
+    Returns:
+        str: The normalized value.
+    """
+    return " ".join(str(value).split())
+
+
+def clear_interned_cache() -> None:
+    """
+    Forget the cached interned values, needed when the database is dropped.
+    """
+    global _indexes_created
+
+    _codes.clear()
+    _labels.clear()
+    _indexes_created = False
+
+
+async def _interned_collection() -> AsyncIOMotorCollection:
+    global _indexes_created
+
+    collection: AsyncIOMotorCollection = await database.get_collection("interned_values")
+    if not _indexes_created:
+        await collection.create_index([("kind", 1), ("key", 1)], unique=True)
+        await collection.create_index([("kind", 1), ("code", 1)], unique=True)
+        _indexes_created = True
+    return collection
+
+
+async def intern_value(kind: str, value: str, create: bool = True) -> Optional[int]:
+    """
+    Get the small integer code of a free text value, allocating one the first time it is seen.
+
+    Skills are matched case insensitively and keep the first spelling seen as their label. Other
+    kinds, such as nationality and city, are matched by their exact normalized value, so a
+    candidate's spelling is never replaced by another candidate's.
+
+    Args:
+        kind: str - The kind of value, e.g. "skills" or "city".
+        value: str - The value to intern.
+        create: bool - Allocate a code when the value is unknown.
+
+    Returns:
+        Optional[int]: The code, None if the value is unknown and `create` is False.
+    """
+    label: str = normalize_value(value)
+    cache_key: Tuple[str, str] = (kind, label.casefold() if kind == SKILLS_FIELD else label)
+    if cache_key in _codes:
+        return _codes[cache_key]
+
+    collection: AsyncIOMotorCollection = await _interned_collection()
+    interned: Optional[Dict] = await collection.find_one({"kind": kind, "key": cache_key[1]})
+    if not interned and create:
+        counters: AsyncIOMotorCollection = await database.get_collection("counters")
+        counter: Dict = await counters.find_one_and_update(
+            {"_id": f"interned_{kind}"}, {"$inc": {"value": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        interned = {"kind": kind, "key": cache_key[1], "label": label, "code": counter["value"]}
+        try:
+            await collection.insert_one(dict(interned))
+        except DuplicateKeyError:
+            interned = await collection.find_one({"kind": kind, "key": cache_key[1]})
+    if not interned:
+        return None
+
+    _codes[cache_key] = interned["code"]
+    _labels[(kind, interned["code"])] = interned["label"]
+    return interned["code"]
+
+
+async def lookup_labels(kind: str, codes: List[int]) -> List[str]:
+    """
+    Resolve interned codes back to their labels.
+
+    Args:
+        kind: str - The kind of value.
+        codes: List[int] - The codes to resolve.
+
+    Returns:
+        List[str]: The labels in the order of the codes.
+    """
+    missing: List[int] = [code for code in codes if (kind, code) not in _labels]
+    if missing:
+        collection: AsyncIOMotorCollection = await _interned_collection()
+        async for interned in collection.find({"kind": kind, "code": {"$in": missing}}):
+            _codes[(kind, interned["key"])] = interned["code"]
+            _labels[(kind, interned["code"])] = interned["label"]
+
+    return [_labels.get((kind, code), str(code)) for code in codes]
+
+
+def encode_uuid(value: str) -> Any:
+    """
+    Encode a uuid string as a 16 byte BSON binary.
+
+    Args:
+        value: str - The uuid string.
+
+    Returns:
+        Any: The BSON binary, or the value unchanged when it is not a valid uuid.
+    """
+    try:
+        return Binary.from_uuid(uuid.UUID(value), UuidRepresentation.STANDARD)
+    except (TypeError, ValueError):
+        return value
+
+
+def canonical_uuid(value: str) -> str:
+    """
+    Get the canonical lowercase hyphenated spelling of a uuid.
+
+    Args:
+        value: str - The uuid in any spelling `uuid.UUID` accepts.
+
+    Returns:
+        str: The canonical uuid, or the value unchanged when it is not a valid uuid.
+    """
+    try:
+        return str(uuid.UUID(value))
+    except (TypeError, ValueError):
+        return value
+
+
+def decode_uuid(value: Any) -> str:
+    """
+    Decode a stored uuid to its string form.
+
+    Args:
+        value: Any - BSON binary, `uuid.UUID` or legacy string.
+
+    Returns:
+        str: The uuid string.
+    """
+    if isinstance(value, Binary):
+        return str(value.as_uuid(UuidRepresentation.STANDARD))
+    return canonical_uuid(str(value))
+
+
+async def encode_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert candidate fields to their compact storage form.
+
+    Args:
+        data: Dict[str, Any] - Candidate fields in API form, complete or partial.
+
+    Returns:
+        Dict[str, Any]: The fields in storage form.
+    """
+    encoded: Dict[str, Any] = dict(data)
+    for field, codes in ENUM_FIELDS.items():
+        if encoded.get(field) in codes:
+            encoded[field] = codes[encoded[field]]
+    for field in INTERNED_FIELDS:
+        if encoded.get(field) is not None:
+            encoded[field] = await intern_value(field, encoded[field])
+    if encoded.get(SKILLS_FIELD) is not None:
+        encoded[SKILLS_FIELD] = list(dict.fromkeys([
+            await intern_value(SKILLS_FIELD, skill) for skill in encoded[SKILLS_FIELD]
+        ]))
+    if encoded.get("uuid") is not None:
+        encoded["uuid"] = encode_uuid(encoded["uuid"])
+    return encoded
+
+
+async def encode_candidate(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a candidate to a storage document of the current version.
+
+    Args:
+        data: Dict[str, Any] - The candidate in API form.
+
+    Returns:
+        Dict[str, Any]: The storage document.
+    """
+    encoded: Dict[str, Any] = await encode_fields(data)
+    encoded[VERSION_FIELD] = STORAGE_VERSION
+    return encoded
+
+
+async def decode_candidate(document: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a storage document of any version back to API form.
+
+    Args:
+        document: Optional[Dict[str, Any]] - The stored candidate.
+
+    Returns:
+        Optional[Dict[str, Any]]: The candidate in API form.
+    """
+    if not document or document.get(VERSION_FIELD) != STORAGE_VERSION:
+        return document
+
+    decoded: Dict[str, Any] = dict(document)
+    decoded.pop(VERSION_FIELD)
+    decoded.pop(REVISION_FIELD, None)
+    for field, labels in ENUM_LABELS.items():
+        if isinstance(decoded.get(field), int):
+            decoded[field] = labels[decoded[field]]
+    for field in INTERNED_FIELDS:
+        if isinstance(decoded.get(field), int):
+            decoded[field] = (await lookup_labels(field, [decoded[field]]))[0]
+    if decoded.get(SKILLS_FIELD) is not None:
+        decoded[SKILLS_FIELD] = await lookup_labels(SKILLS_FIELD, decoded[SKILLS_FIELD])
+    if "uuid" in decoded:
+        decoded["uuid"] = decode_uuid(decoded["uuid"])
+    return decoded
+
+
+async def upgrade_candidate(collection: AsyncIOMotorCollection, document: Dict[str, Any], session=None) -> Dict:
+    """
+    Rewrite a legacy candidate document in the current storage version.
+
+    Args:
+        collection: AsyncIOMotorCollection - The candidates collection.
+        document: Dict[str, Any] - The stored candidate.
+        session: AsyncIOMotorClientSession - Optional session of the caller.
+
+    Returns:
+        Dict: The candidate in API form.
+    """
+    if document.get(VERSION_FIELD) == STORAGE_VERSION:
+        return await decode_candidate(document)
+
+    encoded: Dict[str, Any] = await encode_candidate({
+        key: value for key, value in document.items() if key != "_id"
+    })
+    await collection.update_one(
+        {"_id": document["_id"], VERSION_FIELD: {"$exists": False}}, {"$set": encoded}, session=session
+    )
+    return document
+
+
+def uuid_filter(candidate_id: str) -> Dict[str, Any]:
+    """
+    Build a filter matching a candidate uuid in either storage version.
+
+    Args:
+        candidate_id: str - The uuid string.
+
+    Returns:
+        Dict[str, Any]: The filter.
+    """
+    encoded: Any = encode_uuid(candidate_id)
+    if encoded is candidate_id:
+        return {"uuid": candidate_id}
+    return {"uuid": {"$in": [encoded, candidate_id]}}
+
+
+def uuids_filter(candidate_ids: List[str]) -> Dict[str, Any]:
+    """
+    Build a single `$in` filter matching several candidate uuids in either storage version.
+
+    Args:
+        candidate_ids: List[str] - The uuid strings.
+
+    Returns:
+        Dict[str, Any]: The filter.
+    """
+    values: List[Any] = []
+    for candidate_id in candidate_ids:
+        encoded: Any = encode_uuid(candidate_id)
+        if encoded is not candidate_id:
+            values.append(encoded)
+        values.append(candidate_id)
+    return {"uuid": {"$in": values}}
+
+
+async def encode_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert equality filters in API form to match both legacy and compact documents.
+
+    Args:
+        filters: Dict[str, Any] - Field to value filters.
+
+    Returns:
+        Dict[str, Any]: The filters in storage form.
+    """
+    encoded: Dict[str, Any] = {}
+    for field, value in filters.items():
+        code: Any = None
+        if field in ENUM_FIELDS and value in ENUM_FIELDS[field]:
+            code = ENUM_FIELDS[field][value]
+        elif field in INTERNED_FIELDS or field == SKILLS_FIELD:
+            code = await intern_value(field, value, create=False)
+        elif field == "uuid":
+            code = encode_uuid(value)
+
+        encoded[field] = value if code is None or code is value else {"$in": [code, value]}
+    return encoded
+
+
+async def migrate_candidates(batch_size: int = 500) -> int:
+    """
+    Upgrade every legacy candidate document to the current storage version.
+
+    Args:
+        batch_size: int - Number of documents read per batch.
+
+    Returns:
+        int: The number of upgraded documents.
+    """
+    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates")
+
+    upgraded: int = 0
+    legacy = candidates_collection.find({VERSION_FIELD: {"$exists": False}}).batch_size(batch_size)
+    async for document in legacy:
+        await upgrade_candidate(candidates_collection, document)
+        upgraded += 1
+    return upgraded
+
+
+async def storage_report(sample_size: int = 1000) -> Dict[str, Any]:
+    """
+    Measure the size of candidate documents in legacy and compact form, and the index size.
+
+    Args:
+        sample_size: int - Number of documents sampled for the size estimates.
+
+    Returns:
+        Dict[str, Any]: Document counts, average bytes per document and index bytes.
+    """
+    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates")
+
+    stored_sizes: List[int] = []
+    legacy_sizes: List[int] = []
+    compact_sizes: List[int] = []
+    async for document in candidates_collection.find({}).limit(sample_size):
+        legacy: Dict = await decode_candidate(document)
+        stored_sizes.append(len(bson.encode(document)))
+        legacy_sizes.append(len(bson.encode(legacy)))
+        compact_sizes.append(len(bson.encode(await encode_candidate(legacy))))
+
+    try:
+        stats: List[Dict] = await candidates_collection.aggregate(
+            [{"$collStats": {"storageStats": {}}}]
+        ).to_list(None)
+    except OperationFailure:
+        # The collection does not exist yet.
+        stats = []
+    storage_stats: Dict = stats[0]["storageStats"] if stats else {}
+
+    def average(sizes: List[int]) -> float:
+        return round(sum(sizes) / len(sizes), 1) if sizes else 0.0
+
+    return {
+        "documents": await candidates_collection.count_documents({}),
+        "compact_documents": await candidates_collection.count_documents({VERSION_FIELD: STORAGE_VERSION}),
+        "avg_document_bytes": average(stored_sizes),
+        "avg_legacy_document_bytes": average(legacy_sizes),
+        "avg_compact_document_bytes": average(compact_sizes),
+        "total_index_bytes": storage_stats.get("totalIndexSize", 0),
+        "index_bytes": storage_stats.get("indexSizes", {}),
+    }
+
+
+@job("candidate_storage_migration")
+async def migrate_candidates_job(context: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Background job upgrading all candidates to the compact storage version.
+
+    Args:
+        context: JobContext - The running job context.
+        payload: Dict[str, Any] - The job arguments, unused.
+
+    Returns:
+        Dict[str, Any]: Storage reports taken before and after the migration.
+    """
+    before: Dict[str, Any] = await storage_report()
+    await context.report_progress(10)
+    upgraded: int = await migrate_candidates()
+    await context.report_progress(90)
+
+    return {"upgraded": upgraded, "before": before, "after": await storage_report()}
@@ -1,8 +1,32 @@
+import asyncio
 import csv
 import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple
 
+from configurations.config import settings
+from database.db import database
+from motor.motor_asyncio import AsyncIOMotorCollection
 from schemas.candidates_schema import SearchParametersSchema
+from views.candidate_storage import (
+    canonical_uuid,
+    REVISION_FIELD,
+    SKILLS_FIELD,
+    decode_candidate,
+    decode_uuid,
+    encode_fields,
+    encode_filters,
+    intern_value,
+    lookup_labels,
+    uuids_filter,
+)
+from views.exports import EXPORT_FIELDS
+from views.jobs import JobContext, job
+
+CSV_REPORT_BATCH_SIZE = 500
+CANDIDATE_UPDATE_ATTEMPTS = 3
+
+_candidate_indexes_created: bool = False
+_history_indexes_created: bool = False
 
 
 async def add_data_filters(candidate_filter: SearchParametersSchema) -> Dict[str, Any]:
@@ -22,19 +46,249 @@ async def add_data_filters(candidate_filter: SearchParametersSchema) -> Dict[str
         if value:
             filters[field] = value
 
-    return filters
+    return await encode_filters(filters)
+
+
+async def build_candidate_update(
+        current: Dict[str, Any],
+        update_fields: Dict[str, Any],
+        add_skills: Optional[List[str]] = None,
+        remove_skills: Optional[List[str]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Diff an update against the current candidate so only changed fields are written.
+
+    Skills to add and remove are applied to the current skills, so the whole update is one write.
+    It must only be applied to the revision of the candidate it was computed from.
+
+    Args:
+        current: Dict[str, Any] - The current candidate in API form.
+        update_fields: Dict[str, Any] - The fields sent by the client.
+        add_skills: Optional[List[str]] - Skills to add to the set of skills.
+        remove_skills: Optional[List[str]] - Skills to remove from the set of skills.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]: The update document, empty for a no-op,
+            and the per-field changes.
+    """
+    encoded_update: Dict[str, Any] = await encode_fields(update_fields)
+    encoded_current: Dict[str, Any] = await encode_fields({field: current.get(field) for field in update_fields})
+    current_skills: List[int] = (await encode_fields({SKILLS_FIELD: current.get(SKILLS_FIELD) or []}))[SKILLS_FIELD]
+
+    update: Dict[str, Any] = {}
+    changes: Dict[str, Dict[str, Any]] = {}
+    for field, value in encoded_update.items():
+        if encoded_current.get(field) != value:
+            update[field] = value
+            changes[field] = {"from": current.get(field), "to": update_fields[field]}
+
+    added: List[int] = [
+        code for code in (await encode_fields({SKILLS_FIELD: add_skills or []}))[SKILLS_FIELD]
+        if code not in current_skills
+    ]
+    if added:
+        changes.setdefault(SKILLS_FIELD, {})["added"] = await lookup_labels(SKILLS_FIELD, added)
+
+    removed: List[int] = list(dict.fromkeys([
+        code for code in [await intern_value(SKILLS_FIELD, skill, create=False) for skill in remove_skills or []]
+        if code in current_skills
+    ]))
+    if removed:
+        changes.setdefault(SKILLS_FIELD, {})["removed"] = await lookup_labels(SKILLS_FIELD, removed)
+
+    if added or removed:
+        update[SKILLS_FIELD] = [code for code in current_skills if code not in removed] + added
+
+    if not update:
+        return {}, changes
+    return {"$set": update, "$inc": {REVISION_FIELD: 1}}, changes
+
+
+async def get_candidates_collection(operation: Optional[str] = None) -> AsyncIOMotorCollection:
+    """
+    Get the candidates collection, creating its indexes on first use.
+
+    Args:
+        operation: Optional[str] - Kind of read, see `Database.get_collection`.
+
+    Returns:
+        AsyncIOMotorCollection: The candidates collection.
+    """
+    global _candidate_indexes_created
+
+    collection: AsyncIOMotorCollection = await database.get_collection("candidates", operation)
+    if not _candidate_indexes_created:
+        await collection.create_index("email", unique=True)
+        await collection.create_index("uuid", unique=True)
+        _candidate_indexes_created = True
+    return collection
+
+
+async def get_history_collection() -> AsyncIOMotorCollection:
+    """
+    Get the candidate history collection, creating its index on first use.
+
+    Returns:
+        AsyncIOMotorCollection: The candidate history collection.
+    """
+    global _history_indexes_created
+
+    collection: AsyncIOMotorCollection = await database.get_collection("candidate_history")
+    if not _history_indexes_created:
+        await collection.create_index([("candidate", 1), ("changed_at", -1)])
+        _history_indexes_created = True
+    return collection
+
+
+async def record_candidate_changes(
+        candidate_id: str, actor: Optional[str], changes: Dict[str, Dict[str, Any]], session=None
+) -> None:
+    """
+    Store the per-field changes of an update in the candidate history collection.
+
+    Args:
+        candidate_id: str - The unique identifier of the candidate.
+        actor: Optional[str] - Email of the user who made the change.
+        changes: Dict[str, Dict[str, Any]] - The changed fields.
+        session: AsyncIOMotorClientSession - Optional session of the caller.
+    """
+    history_collection: AsyncIOMotorCollection = await get_history_collection()
+    await history_collection.insert_one({
+        "candidate": canonical_uuid(candidate_id),
+        "actor": actor,
+        "changed_at": datetime.datetime.utcnow(),
+        "changes": changes,
+    }, session=session)
+
+
+async def fetch_candidates(candidate_ids: List[str], *callers: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch several candidates with a single `$in` query.
+
+    Args:
+        candidate_ids: List[str] - The unique identifiers of the candidates.
+        *callers: Optional[str] - Users whose own earlier writes the read must observe.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The stored candidates keyed by canonical uuid, missing ones are left out.
+    """
+    candidates_collection: AsyncIOMotorCollection = await get_candidates_collection("read")
+    candidate_ids = list(dict.fromkeys(canonical_uuid(candidate_id) for candidate_id in candidate_ids))
+
+    async with database.causal_session(*callers) as session:
+        documents = candidates_collection.find(uuids_filter(candidate_ids), session=session)
+        return {decode_uuid(document["uuid"]): document async for document in documents}
 
 
-def add_data_to_csv(candidates: List[Dict[str, Any]]) -> None:
+class CandidateLoader:
     """
-    Write candidate data to a CSV file.
+    Coalesce concurrent single candidate reads of this worker into one `fetch_candidates` call.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._callers: Set[str] = set()
+        self._dispatch_scheduled: bool = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, candidate_id: str, caller: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load a candidate together with the other reads issued within the same batching window.
+
+        Args:
+            candidate_id: str - The unique identifier of the candidate.
+            caller: Optional[str] - The user whose own earlier writes the read must observe.
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored candidate, None if it does not exist.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.setdefault(canonical_uuid(candidate_id), []).append(future)
+        if caller:
+            self._callers.add(caller)
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_later(settings.CANDIDATE_LOADER_WINDOW, self._start_dispatch)
+
+        return await future
+
+    def _start_dispatch(self) -> None:
+        task: asyncio.Task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self) -> None:
+        pending, callers = self._pending, self._callers
+        self._pending, self._callers, self._dispatch_scheduled = {}, set(), False
+
+        try:
+            candidates: Dict[str, Dict] = await fetch_candidates(list(pending), *callers)
+        except Exception as error:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+            return
+
+        for candidate_id, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(candidates.get(candidate_id))
+
+
+candidate_loader: CandidateLoader = CandidateLoader()
+
+
+def add_data_to_csv(candidates: List[Dict[str, Any]]) -> str:
+    """
+    Write candidate data to a CSV file with one column per exported field.
 
     Args:
         candidates: List[Dict[str, Any]] - List of dictionaries representing candidate data.
+
+    Returns:
+        str: The name of the written file.
     """
     candidate_data = [candidate for candidate in candidates]
+    file_name = f"{datetime.datetime.now()}.csv"
 
-    with open(f"{datetime.datetime.now()}.csv", "w", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=candidate_data[0].keys())
+    with open(file_name, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(EXPORT_FIELDS), extrasaction="ignore")
         writer.writeheader()
         writer.writerows(candidate_data)
+
+    return file_name
+
+
+@job("csv_report")
+async def generate_csv_report_job(context: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Background job writing all candidates to a CSV file.
+
+    Args:
+        context: JobContext - The running job context.
+        payload: Dict[str, Any] - The job arguments, unused.
+
+    Returns:
+        Dict[str, Any]: The name of the generated file and the number of exported candidates.
+    """
+    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates", "export")
+
+    total: int = await candidates_collection.count_documents({})
+    candidates: List[Dict[str, Any]] = []
+    documents = candidates_collection.find({}, {"_id": 0}).batch_size(CSV_REPORT_BATCH_SIZE)
+    async for candidate in documents:
+        candidates.append(await decode_candidate(candidate))
+        if len(candidates) % CSV_REPORT_BATCH_SIZE == 0:
+            # Loading is reported as the first 90% of the job, writing the file as the rest.
+            await context.report_progress(90 * len(candidates) // max(total, 1))
+
+    if not candidates:
+        return {"file_name": None, "candidates": 0}
+
+    await context.report_progress(90)
+    file_name: str = await context.run_in_process(add_data_to_csv, candidates)
+
+    return {"file_name": file_name, "candidates": len(candidates)}
@@ -0,0 +1,233 @@
+import asyncio
+import csv
+import datetime
+import os
+from typing import Any, Dict, List, Literal, Optional, Set, get_origin
+from urllib.parse import quote
+
+from configurations.config import settings
+from database.db import database
+from motor.motor_asyncio import AsyncIOMotorCollection
+from schemas.candidates_schema import CandidateRegisterResponseSchema
+from utils.constants import PARQUET_UNAVAILABLE
+from views.candidate_storage import decode_candidate
+from views.jobs import JobContext, job
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_FIELDS: Dict[str, Any] = {
+    field: info.annotation for field, info in CandidateRegisterResponseSchema.model_fields.items()
+}
+LIST_SEPARATOR = "|"
+MISSING_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def parquet_available() -> bool:
+    """
+    Check whether Parquet exports can be written, which needs pyarrow.
+
+    Returns:
+        bool: True if pyarrow is installed.
+    """
+    return pyarrow is not None
+
+
+def candidate_arrow_schema():
+    """
+    Build the Arrow schema of exported candidates from `CandidateRegisterResponseSchema`.
+
+    Returns:
+        pyarrow.Schema: One column per schema field, enums dictionary encoded.
+    """
+    arrow_fields: List = []
+    for field, annotation in EXPORT_FIELDS.items():
+        if get_origin(annotation) is Literal:
+            arrow_type = pyarrow.dictionary(pyarrow.int8(), pyarrow.string())
+        elif annotation is int:
+            arrow_type = pyarrow.int64()
+        elif annotation is float:
+            arrow_type = pyarrow.float64()
+        elif annotation is list:
+            arrow_type = pyarrow.list_(pyarrow.string())
+        else:
+            arrow_type = pyarrow.string()
+        arrow_fields.append(pyarrow.field(field, arrow_type))
+    return pyarrow.schema(arrow_fields)
+
+
+def normalize_row(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Project a candidate onto the export fields, casting values to the schema types.
+
+    Missing fields and values that cannot be cast are exported as nulls, so heterogeneous
+    documents never break the export.
+
+    Args:
+        candidate: Dict[str, Any] - The candidate in API form.
+
+    Returns:
+        Dict[str, Any]: The exported row.
+    """
+    row: Dict[str, Any] = {}
+    for field, annotation in EXPORT_FIELDS.items():
+        value: Any = candidate.get(field)
+        try:
+            if value is None:
+                row[field] = None
+            elif annotation in (int, float):
+                row[field] = annotation(value)
+            elif annotation is list:
+                values = value if isinstance(value, (list, tuple)) else [value]
+                row[field] = [str(item) for item in values]
+            else:
+                row[field] = str(value)
+        except (TypeError, ValueError):
+            row[field] = None
+    return row
+
+
+def write_export_part(
+        rows: List[Dict[str, Any]], export_format: str, directory: str, part: int, partition_by: Optional[str] = None
+) -> str:
+    """
+    Encode one batch of candidates and write it as a file of the export. Runs on the worker process pool.
+
+    Parquet files leave out the partition column, readers restore it from the directory name.
+
+    Args:
+        rows: List[Dict[str, Any]] - The candidates of the batch.
+        export_format: str - "parquet" or "csv".
+        directory: str - Directory of the batch partition.
+        part: int - Sequence number of the batch, used in the file name.
+        partition_by: Optional[str] - The field the export is partitioned on.
+
+    Returns:
+        str: Path of the written file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rows = [normalize_row(row) for row in rows]
+
+    if export_format == "parquet":
+        path: str = os.path.join(directory, f"part-{part:05d}.parquet")
+        table = pyarrow.Table.from_pylist(rows, schema=candidate_arrow_schema())
+        if partition_by:
+            table = table.drop_columns([partition_by])
+        pyarrow.parquet.write_table(table, path, compression=settings.EXPORT_COMPRESSION)
+        return path
+
+    path = os.path.join(directory, f"part-{part:05d}.csv")
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(EXPORT_FIELDS))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                field: LIST_SEPARATOR.join(value) if isinstance(value, list) else value
+                for field, value in row.items()
+            })
+    return path
+
+
+def partition_directory(directory: str, partition_by: Optional[str], candidate: Dict[str, Any]) -> str:
+    """
+    Get the hive style partition directory of a candidate.
+
+    Args:
+        directory: str - Root directory of the export.
+        partition_by: Optional[str] - The field to partition on.
+        candidate: Dict[str, Any] - The candidate in API form.
+
+    Returns:
+        str: The partition directory.
+    """
+    if not partition_by:
+        return directory
+
+    value: Any = candidate.get(partition_by)
+    partition: str = quote(str(value), safe="") if value not in (None, "") else MISSING_PARTITION
+    return os.path.join(directory, f"{partition_by}={partition}")
+
+
+async def export_candidates(
+        context: JobContext, export_format: str = "parquet", partition_by: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Stream all candidates in batches and write them as a partitioned Parquet or CSV dataset.
+
+    Batches are encoded on the worker process pool while the next ones are read.
+
+    Args:
+        context: JobContext - The running job context.
+        export_format: str - "parquet" or "csv".
+        partition_by: Optional[str] - Field whose values split the output into directories.
+
+    Returns:
+        Dict[str, Any]: Directory, format, number of files and number of rows of the export.
+    """
+    if export_format == "parquet" and not parquet_available():
+        raise RuntimeError(PARQUET_UNAVAILABLE)
+
+    candidates_collection: AsyncIOMotorCollection = await database.get_collection("candidates", "export")
+    directory: str = os.path.join(settings.EXPORT_DIR, datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f"))
+    total: int = await candidates_collection.count_documents({})
+
+    buffers: Dict[str, List[Dict[str, Any]]] = {}
+    pending: Set[asyncio.Future] = set()
+    files: List[str] = []
+    parts: int = 0
+    rows: int = 0
+
+    async def write_part(partition: str, batch: List[Dict[str, Any]]) -> None:
+        nonlocal parts
+        parts += 1
+        pending.add(asyncio.ensure_future(
+            context.run_in_process(write_export_part, batch, export_format, partition, parts, partition_by)
+        ))
+        if len(pending) >= 2 * settings.JOB_WORKER_PROCESSES:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            files.extend(future.result() for future in done)
+
+    try:
+        documents = candidates_collection.find({}, {"_id": 0}).batch_size(settings.EXPORT_BATCH_SIZE)
+        async for document in documents:
+            candidate: Dict[str, Any] = await decode_candidate(document)
+            partition: str = partition_directory(directory, partition_by, candidate)
+            buffers.setdefault(partition, []).append(candidate)
+            rows += 1
+
+            if len(buffers[partition]) >= settings.EXPORT_BATCH_SIZE:
+                await write_part(partition, buffers.pop(partition))
+            if rows % settings.EXPORT_BATCH_SIZE == 0:
+                await context.report_progress(99 * rows // max(total, 1))
+
+        for partition, batch in buffers.items():
+            await write_part(partition, batch)
+
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            pending.clear()
+            files.extend(future.result() for future in done)
+    finally:
+        for future in pending:
+            future.cancel()
+
+    return {"path": directory, "format": export_format, "files": len(files), "rows": rows}
+
+
+@job("candidates_export")
+async def export_candidates_job(context: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Background job exporting all candidates for analytics consumers.
+
+    Args:
+        context: JobContext - The running job context.
+        payload: Dict[str, Any] - "format" and optional "partition_by" of the export.
+
+    Returns:
+        Dict[str, Any]: Summary of the written export.
+    """
+    return await export_candidates(context, payload.get("format", "parquet"), payload.get("partition_by"))
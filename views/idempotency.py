@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from configurations.config import settings
+from database.db import database
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
+from utils.constants import IDEMPOTENCY_KEY_IN_PROGRESS, IDEMPOTENCY_KEY_REUSED
+
+IDEMPOTENCY_COLLECTION = "idempotency_keys"
+PENDING = "pending"
+COMPLETED = "completed"
+POLL_INTERVAL = 0.1
+
+_in_flight: Dict[str, asyncio.Future] = {}
+_indexes_created: bool = False
+
+
+def request_fingerprint(payload: Dict[str, Any]) -> str:
+    """
+    Build a stable fingerprint of a request payload.
+
+    Args:
+        payload: Dict[str, Any] - The request body.
+
+    Returns:
+        str: Hex digest identifying the payload.
+    """
+    encoded: bytes = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+async def get_idempotency_collection() -> AsyncIOMotorCollection:
+    """
+    Get the idempotency keys collection, creating its indexes on first use.
+
+    Returns:
+        AsyncIOMotorCollection: The idempotency keys collection.
+    """
+    global _indexes_created
+
+    collection: AsyncIOMotorCollection = await database.get_collection(IDEMPOTENCY_COLLECTION)
+    if not _indexes_created:
+        await collection.create_index("key", unique=True)
+        await collection.create_index("created_at", expireAfterSeconds=settings.IDEMPOTENCY_KEY_TTL)
+        _indexes_created = True
+    return collection
+
+
+async def run_idempotent(
+        scope: str,
+        idempotency_key: Optional[str],
+        payload: Dict[str, Any],
+        operation: Callable[[], Awaitable[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """
+    Run an operation at most once per idempotency key.
+
+    The key is claimed with a pending record before the operation runs, so concurrent
+    requests on any API process wait for the first execution and replay its response.
+    Requests in this process share the in-flight execution without polling.
+
+    Args:
+        scope: str - Namespace of the key, the route path and the caller.
+        idempotency_key: Optional[str] - The client supplied `Idempotency-Key` header.
+        payload: Dict[str, Any] - The request body, used to detect key reuse.
+        operation: Callable[[], Awaitable[Dict[str, Any]]] - The operation to run.
+
+    Returns:
+        Dict[str, Any]: The response of the first successful execution.
+    """
+    if not idempotency_key:
+        return await operation()
+
+    key: str = f"{scope}:{idempotency_key}"
+    fingerprint: str = request_fingerprint(payload)
+
+    in_flight: Optional[asyncio.Future] = _in_flight.get(key)
+    if in_flight is not None:
+        stored: Dict = await asyncio.shield(in_flight)
+        return _check_replay(stored, fingerprint)
+
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        stored = await _run_once(key, fingerprint, operation)
+        future.set_result(stored)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as error:
+        future.set_exception(error)
+        # Mark the exception as retrieved when no concurrent request is waiting on it.
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(key, None)
+
+    return _check_replay(stored, fingerprint)
+
+
+async def _run_once(
+        key: str, fingerprint: str, operation: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Claim the key and run the operation, or wait for the request holding the claim.
+
+    Args:
+        key: str - The scoped idempotency key.
+        fingerprint: str - Fingerprint of the request payload.
+        operation: Callable[[], Awaitable[Dict[str, Any]]] - The operation to run.
+
+    Returns:
+        Dict[str, Any]: The completed idempotency record.
+    """
+    collection: AsyncIOMotorCollection = await get_idempotency_collection()
+    while True:
+        try:
+            await collection.insert_one({
+                "key": key,
+                "fingerprint": fingerprint,
+                "status": PENDING,
+                "created_at": datetime.utcnow(),
+            })
+        except DuplicateKeyError:
+            stored: Optional[Dict] = await _wait_for_record(collection, key, fingerprint)
+            if stored is not None:
+                return stored
+            continue
+
+        try:
+            response: Dict[str, Any] = await operation()
+        except BaseException:
+            # Release the claim so a retry runs the operation again.
+            await collection.delete_one({"key": key, "status": PENDING})
+            raise
+
+        await collection.update_one({"key": key}, {"$set": {"status": COMPLETED, "response": response}})
+        return {"key": key, "fingerprint": fingerprint, "status": COMPLETED, "response": response}
+
+
+async def _wait_for_record(
+        collection: AsyncIOMotorCollection, key: str, fingerprint: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Wait until the request holding the claim on a key has stored its response.
+
+    Args:
+        collection: AsyncIOMotorCollection - The idempotency keys collection.
+        key: str - The scoped idempotency key.
+        fingerprint: str - Fingerprint of the waiting request payload.
+
+    Returns:
+        Optional[Dict[str, Any]]: The completed record, None when the claim was released and can be taken.
+    """
+    deadline: float = asyncio.get_running_loop().time() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        stored: Optional[Dict] = await collection.find_one({"key": key})
+        if stored is None:
+            return None
+        _check_fingerprint(stored, fingerprint)
+        if stored.get("status", COMPLETED) == COMPLETED:
+            return stored
+
+        claimed_for: timedelta = datetime.utcnow() - stored["created_at"]
+        if claimed_for > timedelta(seconds=settings.IDEMPOTENCY_CLAIM_TIMEOUT):
+            # The claiming request died without releasing the key.
+            await collection.delete_one({"_id": stored["_id"], "status": PENDING})
+            return None
+
+        if asyncio.get_running_loop().time() >= deadline:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=IDEMPOTENCY_KEY_IN_PROGRESS)
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def _check_replay(stored: Dict[str, Any], fingerprint: str) -> Dict[str, Any]:
+    """
+    Return the stored response if it was produced for the same payload.
+
+    Args:
+        stored: Dict[str, Any] - The stored idempotency record.
+        fingerprint: str - Fingerprint of the current request payload.
+
+    Returns:
+        Dict[str, Any]: The stored response.
+    """
+    _check_fingerprint(stored, fingerprint)
+    return stored["response"]
+
+
+def _check_fingerprint(stored: Dict[str, Any], fingerprint: str) -> None:
+    """
+    Reject a key that was already used for a different payload.
+
+    Args:
+        stored: Dict[str, Any] - The stored idempotency record.
+        fingerprint: str - Fingerprint of the current request payload.
+    """
+    if stored["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=IDEMPOTENCY_KEY_REUSED
+        )
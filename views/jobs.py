@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from configurations.config import settings
+from database.db import database
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[["JobContext", Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+LEASE_EXPIRED = "Job lease expired, the worker running it stopped"
+
+_indexes_created: bool = False
+
+
+class JobCancelledError(Exception):
+    """
+    Raised inside a running job once its cancellation has been requested.
+    """
+
+
+class JobLeaseLostError(Exception):
+    """
+    Raised inside a running job once its lease expired and another worker claimed it again.
+    """
+
+
+def job(name: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register a coroutine as the handler of a job.
+
+    Args:
+        name: str - The name the job is enqueued with.
+
+    Returns:
+        Callable[[JobHandler], JobHandler]: Decorator registering the handler.
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[name] = handler
+        return handler
+
+    return decorator
+
+
+class MongoJobQueue:
+    """
+    Job queue persisted in the `jobs` MongoDB collection, shared by the API and the workers.
+    """
+
+    async def _collection(self) -> AsyncIOMotorCollection:
+        global _indexes_created
+
+        collection: AsyncIOMotorCollection = await database.get_collection("jobs")
+        if not _indexes_created:
+            await collection.create_index("job_id", unique=True)
+            await collection.create_index([("status", 1), ("run_at", 1)])
+            _indexes_created = True
+        return collection
+
+    async def enqueue(self, job_data: Dict[str, Any]) -> None:
+        collection: AsyncIOMotorCollection = await self._collection()
+        await collection.insert_one(dict(job_data))
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        collection: AsyncIOMotorCollection = await self._collection()
+        return await collection.find_one({"job_id": job_id}, {"_id": 0})
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        collection: AsyncIOMotorCollection = await self._collection()
+        now: datetime = datetime.utcnow()
+        return await collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_at": {"$lte": now}},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": "running", "lease_until": lease_deadline(now), "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            projection={"_id": 0},
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def update(
+            self, job_id: str, fields: Dict[str, Any], attempt: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        collection: AsyncIOMotorCollection = await self._collection()
+        job_filter: Dict[str, Any] = {"job_id": job_id}
+        if attempt is not None:
+            job_filter["attempts"] = attempt
+        return await collection.find_one_and_update(
+            job_filter,
+            {"$set": {**fields, "updated_at": datetime.utcnow()}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        collection: AsyncIOMotorCollection = await self._collection()
+        now: datetime = datetime.utcnow()
+        cancelled: Optional[Dict] = await collection.find_one_and_update(
+            {"job_id": job_id, "status": "queued"},
+            {"$set": {"status": "cancelled", "cancel_requested": True, "updated_at": now}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        if cancelled:
+            return cancelled
+
+        return await collection.find_one_and_update(
+            {"job_id": job_id, "status": "running"},
+            {"$set": {"cancel_requested": True, "updated_at": now}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+
+class InMemoryJobQueue:
+    """
+    Process local stand-in for `MongoJobQueue`, used when the worker runs inside the API process.
+    """
+
+    def __init__(self) -> None:
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+
+    async def enqueue(self, job_data: Dict[str, Any]) -> None:
+        self.jobs[job_data["job_id"]] = dict(job_data)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job_data: Optional[Dict] = self.jobs.get(job_id)
+        return dict(job_data) if job_data else None
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        now: datetime = datetime.utcnow()
+        ready: List[Dict] = [
+            job_data for job_data in self.jobs.values()
+            if (job_data["status"] == "queued" and job_data["run_at"] <= now)
+            or (job_data["status"] == "running" and job_data["lease_until"] < now)
+        ]
+        if not ready:
+            return None
+
+        job_data: Dict = min(ready, key=lambda queued: queued["run_at"])
+        job_data.update(
+            status="running", lease_until=lease_deadline(now), updated_at=now, attempts=job_data["attempts"] + 1
+        )
+        return dict(job_data)
+
+    async def update(
+            self, job_id: str, fields: Dict[str, Any], attempt: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        job_data: Optional[Dict] = self.jobs.get(job_id)
+        if not job_data or (attempt is not None and job_data["attempts"] != attempt):
+            return None
+        job_data.update(fields, updated_at=datetime.utcnow())
+        return dict(job_data)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job_data: Optional[Dict] = self.jobs.get(job_id)
+        if not job_data or job_data["status"] in FINISHED_STATUSES:
+            return None
+        if job_data["status"] == "queued":
+            job_data["status"] = "cancelled"
+        job_data.update(cancel_requested=True, updated_at=datetime.utcnow())
+        return dict(job_data)
+
+
+def lease_deadline(now: Optional[datetime] = None) -> datetime:
+    """
+    Get the time until which a claimed job belongs to its worker.
+
+    Args:
+        now: Optional[datetime] - The current time.
+
+    Returns:
+        datetime: The lease expiry, after which another worker may claim the job again.
+    """
+    return (now or datetime.utcnow()) + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+_job_queue = None
+
+
+def get_job_queue():
+    """
+    Get the job queue configured by `JOB_QUEUE_BACKEND`.
+
+    Returns:
+        MongoJobQueue | InMemoryJobQueue: The job queue instance.
+    """
+    global _job_queue
+
+    if _job_queue is None:
+        _job_queue = InMemoryJobQueue() if settings.JOB_QUEUE_BACKEND == "memory" else MongoJobQueue()
+    return _job_queue
+
+
+async def enqueue_job(name: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Add a job to the queue.
+
+    Args:
+        name: str - The registered name of the job.
+        payload: Optional[Dict[str, Any]] - Arguments passed to the job handler.
+
+    Returns:
+        Dict[str, Any]: The queued job.
+    """
+    now: datetime = datetime.utcnow()
+    job_data: Dict[str, Any] = {
+        "job_id": str(uuid.uuid4()),
+        "name": name,
+        "payload": payload or {},
+        "status": "queued",
+        "progress": 0,
+        "attempts": 0,
+        "max_attempts": settings.JOB_MAX_ATTEMPTS,
+        "cancel_requested": False,
+        "error": None,
+        "result": None,
+        "run_at": now,
+        "lease_until": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await get_job_queue().enqueue(job_data)
+    return job_data
+
+
+class JobContext:
+    """
+    Handle given to a running job to report progress and offload CPU bound work.
+    """
+
+    def __init__(self, job_id: str, queue, executor: Optional[Executor] = None, attempt: Optional[int] = None) -> None:
+        self.job_id = job_id
+        self.queue = queue
+        self.executor = executor
+        self.attempt = attempt
+        self.lease_lost = False
+
+    async def update(self, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update the job, unless another worker claimed it again since this attempt started.
+
+        Args:
+            fields: Dict[str, Any] - The fields to set.
+
+        Returns:
+            Optional[Dict[str, Any]]: The updated job, None if the lease was lost.
+        """
+        job_data: Optional[Dict] = await self.queue.update(self.job_id, fields, attempt=self.attempt)
+        if job_data is None:
+            self.lease_lost = True
+        return job_data
+
+    async def report_progress(self, progress: int) -> None:
+        """
+        Store the job progress, renew the lease and stop the job if it has been cancelled.
+
+        Args:
+            progress: int - Percentage of the job that is done.
+        """
+        job_data: Optional[Dict] = await self.update(
+            {"progress": min(int(progress), 100), "lease_until": lease_deadline()}
+        )
+        if job_data is None:
+            raise JobLeaseLostError(self.job_id)
+        if job_data.get("cancel_requested"):
+            raise JobCancelledError(self.job_id)
+
+    async def keep_lease(self, run: asyncio.Future) -> None:
+        """
+        Renew the lease while the job runs, so jobs that rarely report progress are not claimed twice.
+
+        Args:
+            run: asyncio.Future - The running job, cancelled if the lease is lost.
+        """
+        while not run.done():
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            if await self.update({"lease_until": lease_deadline()}) is None:
+                run.cancel()
+                return
+
+    async def run_in_process(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a picklable function on the worker process pool.
+
+        Args:
+            func: Callable[..., Any] - Module level function to run.
+            *args: Any - Picklable arguments of the function.
+
+        Returns:
+            Any: The function result.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+
+async def process_next_job(queue=None, executor: Optional[Executor] = None) -> Optional[Dict[str, Any]]:
+    """
+    Claim the next due job and run it, scheduling a retry with backoff when it fails.
+
+    Jobs whose worker stopped without finishing them are claimed again once their lease expires.
+    Every write of an attempt is fenced by its attempt number, so a worker whose job was claimed
+    again stops and cannot overwrite the newer attempt.
+
+    Args:
+        queue: MongoJobQueue | InMemoryJobQueue - The queue to claim from, defaults to the configured one.
+        executor: Optional[Executor] - Pool used for CPU bound work, the loop default executor if None.
+
+    Returns:
+        Optional[Dict[str, Any]]: The job in its final state for this attempt, None if nothing was due
+            or the lease was lost.
+    """
+    queue = queue or get_job_queue()
+    job_data: Optional[Dict] = await queue.claim()
+    if not job_data:
+        return None
+
+    job_id: str = job_data["job_id"]
+    context: JobContext = JobContext(job_id, queue, executor, attempt=job_data["attempts"])
+    handler: Optional[JobHandler] = JOB_HANDLERS.get(job_data["name"])
+    if handler is None:
+        return await context.update({"status": "failed", "error": f"Unknown job {job_data['name']}"})
+    if job_data.get("cancel_requested"):
+        return await context.update({"status": "cancelled"})
+    if job_data["attempts"] > job_data["max_attempts"]:
+        return await context.update({"status": "failed", "error": LEASE_EXPIRED})
+
+    run: asyncio.Future = asyncio.ensure_future(handler(context, job_data["payload"]))
+    lease: asyncio.Task = asyncio.create_task(context.keep_lease(run))
+    try:
+        result: Optional[Dict] = await run
+    except JobLeaseLostError:
+        logger.warning("Job %s lost its lease during attempt %d", job_id, context.attempt)
+        return None
+    except asyncio.CancelledError:
+        if not context.lease_lost:
+            raise
+        logger.warning("Job %s lost its lease during attempt %d", job_id, context.attempt)
+        return None
+    except JobCancelledError:
+        return await context.update({"status": "cancelled"})
+    except Exception as error:
+        logger.exception("Job %s (%s) failed", job_id, job_data["name"])
+        if job_data["attempts"] >= job_data["max_attempts"]:
+            return await context.update({"status": "failed", "error": str(error)})
+
+        delay: float = settings.JOB_RETRY_BACKOFF * 2 ** (job_data["attempts"] - 1)
+        return await context.update({
+            "status": "queued",
+            "error": str(error),
+            "run_at": datetime.utcnow() + timedelta(seconds=delay),
+        })
+    finally:
+        lease.cancel()
+
+    return await context.update({"status": "completed", "progress": 100, "result": result})
+
+
+async def run_worker(stop_event: Optional[asyncio.Event] = None) -> None:
+    """
+    Poll the queue and run jobs until the stop event is set.
+
+    Args:
+        stop_event: Optional[asyncio.Event] - Event that stops the worker once set.
+    """
+    stop_event = stop_event or asyncio.Event()
+    with ProcessPoolExecutor(max_workers=settings.JOB_WORKER_PROCESSES) as executor:
+        while not stop_event.is_set():
+            job_data: Optional[Dict] = await process_next_job(executor=executor)
+            if job_data is None:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
@@ -4,6 +4,7 @@ from typing import Optional, Union, Dict
 from configurations.config import settings
 from database.db import database
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
 from motor.motor_asyncio import AsyncIOMotorCollection
@@ -12,6 +13,24 @@ from passlib.context import CryptContext
 
 HASH_STRING = CryptContext(schemes=["bcrypt"])
 
+_indexes_created: bool = False
+
+
+async def get_user_collection() -> AsyncIOMotorCollection:
+    """
+    Get the users collection, creating its unique email index on first use.
+
+    Returns:
+        AsyncIOMotorCollection: The users collection.
+    """
+    global _indexes_created
+
+    collection: AsyncIOMotorCollection = await database.get_collection("users")
+    if not _indexes_created:
+        await collection.create_index("email", unique=True)
+        _indexes_created = True
+    return collection
+
 
 def verify_password_hash(plain_password: str, hashed_password: str) -> bool:
     """
@@ -53,7 +72,7 @@ async def authenticate_user(email: str, password: str, user_collection: AsyncIOM
         bool: True if authentication succeeds, False otherwise.
     """
     user: Dict = await user_collection.find_one({"email": email})
-    if not user or not verify_password_hash(password, user.get("password")):
+    if not user or not await run_in_threadpool(verify_password_hash, password, user.get("password")):
         return False
     return True
 
@@ -0,0 +1,7 @@
+import asyncio
+
+import views.candidates  # noqa: F401 - registers the candidate job handlers
+from views.jobs import run_worker
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())